@@ -2,73 +2,179 @@
 # Auth Router - Kimlik Doğrulama (SQLite Uyumlu)
 # =============================================
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from datetime import datetime, timedelta
-from typing import Optional
+from fastapi.responses import ORJSONResponse
+from datetime import timedelta
+from typing import Final, Optional
+import base64
 import hashlib
+import hmac
 import secrets
-import jwt
+import sqlite3
+import threading
+import time
+import orjson
 import os
+from argon2 import PasswordHasher, exceptions as _a2e
+from cachetools import TTLCache
 
-from database.connection import get_db
+from database.connection import current_timestamp, get_db
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 security = HTTPBearer(auto_error=False)
 
 # JWT ayarları
 SECRET_KEY = os.getenv("SECRET_KEY", "gercekmi-super-secret-key-2024")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 7
+_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+def _b64url_encode(raw: bytes) -> bytes:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=")
+
+def _b64url_decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+# Sabit header ve anahtar bir kez hazırlanır, token başına sadece imza hesaplanır
+_HEADER_B64 = _b64url_encode(b'{"alg":"HS256","typ":"JWT"}')
+_KEY = SECRET_KEY.encode()
+
+# Şifre hash ayarları (Argon2id); maliyet sunucuya göre ortamdan ayarlanabilir,
+# parametreler değişince eski hash'ler girişte yeniden üretilir
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 1))
+_ph = PasswordHasher(
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM
+)
+# Bilinmeyen e-postalarda da aynı sürede cevap vermek için sahte hash
+_DUMMY_HASH = _ph.hash(secrets.token_urlsafe(16))
+
+# =============================================
+# SQL
+# =============================================
+
+# Sorgu metinleri sabit tutulur ki bağlantının statement cache'inden
+# hazırlanmış hali tekrar kullanılsın
+SQL_USER_BY_ID: Final[str] = (
+    "SELECT id, username, email, display_name, avatar_url, is_editor, is_active, created_at "
+    "FROM users WHERE id = ?"
+)
+
+SQL_USER_BY_EMAIL: Final[str] = (
+    "SELECT id, username, email, password_hash, display_name, avatar_url, is_editor, created_at "
+    "FROM users WHERE email = ? AND is_active = 1"
+)
+
+SQL_INSERT_USER: Final[str] = """
+    INSERT INTO users (username, email, password_hash, display_name, created_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
 
 # =============================================
 # YARDIMCI FONKSİYONLAR
 # =============================================
 
+def _is_legacy_hash(hashed_password: str) -> bool:
+    """Eski (tuzsuz SHA256) hash mi?"""
+    return not hashed_password.startswith("$argon2")
+
 def hash_password(password: str) -> str:
-    """Şifreyi hashle (basit SHA256)"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Şifreyi hashle (Argon2id)"""
+    return _ph.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Şifreyi doğrula"""
-    return hash_password(plain_password) == hashed_password
+    """Şifreyi doğrula (eski SHA256 hash'leri de kabul edilir)"""
+    if _is_legacy_hash(hashed_password):
+        legacy = hashlib.sha256(plain_password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, hashed_password)
+    try:
+        return _ph.verify(hashed_password, plain_password)
+    except (_a2e.VerificationError, _a2e.InvalidHashError):
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Hash güncel Argon2 parametreleriyle yeniden üretilmeli mi?"""
+    return _is_legacy_hash(hashed_password) or _ph.check_needs_rehash(hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """JWT token oluştur"""
+    """JWT token oluştur (HS256)"""
     to_encode = data.copy()
-    # user_id'yi string'e çevir
-    if "sub" in to_encode:
-        to_encode["sub"] = str(to_encode["sub"])
+    # Kullanıcı id'si sayısal "uid" claim'inde taşınır
+    to_encode["uid"] = int(to_encode.pop("sub", to_encode.get("uid", 0)))
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        to_encode["exp"] = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+        to_encode["exp"] = int(time.time()) + _EXPIRE_SECONDS
+    
+    signing_input = _HEADER_B64 + b"." + _b64url_encode(orjson.dumps(to_encode))
+    signature = hmac.new(_KEY, signing_input, hashlib.sha256).digest()
+    return (signing_input + b"." + _b64url_encode(signature)).decode()
+
+# Doğrulanmış token -> payload cache'i; süre kontrolü her isabette exp ile yapılır
+_TOKEN_CACHE = TTLCache(maxsize=10000, ttl=_EXPIRE_SECONDS)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+def _token_key(token: str) -> bytes:
+    """Cache anahtarı (güvenlik için değil, ham token'ı tutmamak için)"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
 
 def decode_token(token: str) -> Optional[dict]:
-    """JWT token çöz"""
+    """JWT token çöz (imza ve süre kontrolü dahil, geçerli token'lar cache'lenir)"""
+    cache_key = _token_key(token)
+    with _TOKEN_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(cache_key)
+    if cached:
+        return cached if cached["exp"] > time.time() else None
+    
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        # sub'ı integer'a çevir
-        if "sub" in payload:
-            payload["sub"] = int(payload["sub"])
-        return payload
-    except jwt.ExpiredSignatureError:
-        return None
+        raw = token.encode()
+        signing_input, _, signature = raw.rpartition(b".")
+        header, _, payload_b64 = signing_input.partition(b".")
+        if header != _HEADER_B64:
+            return None
+        
+        expected = hmac.new(_KEY, signing_input, hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            return None
+        
+        payload = orjson.loads(_b64url_decode(payload_b64))
+        exp = payload.get("exp")
+        if exp is None or exp < time.time():
+            return None
     except Exception:
         return None
+    
+    # Sadece geçerli token'lar cache'e girer
+    with _TOKEN_CACHE_LOCK:
+        _TOKEN_CACHE[cache_key] = payload
+    return payload
+
+# =============================================
+# KULLANICI CACHE
+# =============================================
+
+# Token -> kullanıcı cache'i; TTL, is_active gibi değişikliklerin
+# en fazla ne kadar gecikmeyle yansıyacağını belirler
+_USER_CACHE = TTLCache(maxsize=10000, ttl=60)
+_USER_CACHE_LOCK = threading.Lock()
+
+def invalidate_user(user_id: int):
+    """Kullanıcının cache'teki tüm kayıtlarını sil (profil/yetki değişikliklerinde)"""
+    with _USER_CACHE_LOCK:
+        stale = [key for key, (user, _) in _USER_CACHE.items() if user["id"] == user_id]
+        for key in stale:
+            _USER_CACHE.pop(key, None)
 
 # =============================================
 # DEPENDENCY'LER
 # =============================================
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db = Depends(get_db)
-) -> dict:
-    """Mevcut kullanıcıyı getir (zorunlu)"""
+def _load_user(credentials: Optional[HTTPAuthorizationCredentials], db) -> dict:
+    """Token'dan kullanıcıyı çöz (cache -> token -> veritabanı)"""
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -77,6 +183,12 @@ async def get_current_user(
         )
     
     token = credentials.credentials
+    cache_key = _token_key(token)
+    with _USER_CACHE_LOCK:
+        cached = _USER_CACHE.get(cache_key)
+    if cached and cached[1] > time.time():
+        return cached[0]
+    
     payload = decode_token(token)
     
     if not payload:
@@ -86,7 +198,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id = payload.get("sub")
+    user_id = payload.get("uid")
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,10 +206,7 @@ async def get_current_user(
         )
     
     cursor = db.cursor()
-    cursor.execute(
-        "SELECT id, username, email, display_name, avatar_url, is_editor, is_active, created_at FROM users WHERE id = ?",
-        (user_id,)
-    )
+    cursor.execute(SQL_USER_BY_ID, (user_id,))
     user = cursor.fetchone()
     
     if not user:
@@ -112,7 +221,7 @@ async def get_current_user(
             detail="Hesap devre dışı",
         )
     
-    return {
+    current_user = {
         "id": user[0],
         "username": user[1],
         "email": user[2],
@@ -122,8 +231,26 @@ async def get_current_user(
         "is_active": bool(user[6]),
         "created_at": user[7]
     }
+    
+    with _USER_CACHE_LOCK:
+        _USER_CACHE[cache_key] = (current_user, payload["exp"])
+    
+    return current_user
 
-async def get_current_user_optional(
+def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db = Depends(get_db)
+) -> dict:
+    """Mevcut kullanıcıyı getir (zorunlu, istek başına bir kez çözülür)"""
+    if hasattr(request.state, "user"):
+        return request.state.user
+    
+    request.state.user = _load_user(credentials, db)
+    return request.state.user
+
+def get_current_user_optional(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db = Depends(get_db)
 ) -> Optional[dict]:
@@ -132,7 +259,7 @@ async def get_current_user_optional(
         return None
     
     try:
-        return await get_current_user(credentials, db)
+        return get_current_user(request, credentials, db)
     except HTTPException:
         return None
 
@@ -141,7 +268,7 @@ async def get_current_user_optional(
 # =============================================
 
 @router.post("/register")
-async def register(user_data: dict, db = Depends(get_db)):
+def register(user_data: dict, now: str = Depends(current_timestamp), db = Depends(get_db)):
     """
     Yeni kullanıcı kaydı
     """
@@ -157,41 +284,42 @@ async def register(user_data: dict, db = Depends(get_db)):
             detail="Kullanıcı adı, e-posta ve şifre gerekli"
         )
     
-    # Email kontrolü
-    cursor.execute("SELECT id FROM users WHERE email = ?", (email,))
-    if cursor.fetchone():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu e-posta adresi zaten kullanılıyor"
-        )
+    # Şifreyi hashle
+    password_hash = hash_password(password)
     
-    # Username kontrolü
-    cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-    if cursor.fetchone():
+    # Kullanıcıyı oluştur (benzersizlik kontrolü UNIQUE kısıtlarına bırakılır)
+    try:
+        cursor.execute(
+            SQL_INSERT_USER,
+            (username, email, password_hash, username, now, now)
+        )
+    except sqlite3.IntegrityError:
+        # Hangi alanın çakıştığını sadece hata durumunda bul; ikisi de farklı
+        # kullanıcılarda doluysa önce e-posta çakışması raporlanır
+        cursor.execute(
+            """
+            SELECT CASE WHEN email = ? THEN 'email' ELSE 'username' END
+            FROM users WHERE email = ? OR username = ?
+            ORDER BY email = ? DESC LIMIT 1
+            """,
+            (email, email, username, email)
+        )
+        conflict = cursor.fetchone()
+        if conflict and conflict[0] == "email":
+            detail = "Bu e-posta adresi zaten kullanılıyor"
+        else:
+            detail = "Bu kullanıcı adı zaten kullanılıyor"
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu kullanıcı adı zaten kullanılıyor"
+            detail=detail
         )
     
-    # Şifreyi hashle
-    password_hash = hash_password(password)
-    created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    # Kullanıcıyı oluştur
-    cursor.execute(
-        """
-        INSERT INTO users (username, email, password_hash, display_name, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (username, email, password_hash, username, created_at, created_at)
-    )
-    
     user_id = cursor.lastrowid
     db.commit()
     
     # Token oluştur
-    access_token = create_access_token(data={"sub": user_id})
-    expires_in = ACCESS_TOKEN_EXPIRE_DAYS * 24 * 60 * 60  # saniye cinsinden
+    access_token = create_access_token(data={"uid": user_id})
+    expires_in = _EXPIRE_SECONDS  # saniye cinsinden
     
     return {
         "access_token": access_token,
@@ -204,12 +332,12 @@ async def register(user_data: dict, db = Depends(get_db)):
             "display_name": username,
             "avatar_url": None,
             "is_editor": False,
-            "created_at": created_at
+            "created_at": now
         }
     }
 
 @router.post("/login")
-async def login(credentials: dict, db = Depends(get_db)):
+def login(credentials: dict, db = Depends(get_db)):
     """
     Kullanıcı girişi
     """
@@ -224,14 +352,13 @@ async def login(credentials: dict, db = Depends(get_db)):
             detail="E-posta ve şifre gerekli"
         )
     
-    # Kullanıcıyı bul
-    cursor.execute(
-        "SELECT id, username, email, password_hash, display_name, avatar_url, is_editor, is_active, created_at FROM users WHERE email = ?",
-        (email,)
-    )
+    # Kullanıcıyı bul (devre dışı hesaplar eşleşmez)
+    cursor.execute(SQL_USER_BY_EMAIL, (email,))
     user = cursor.fetchone()
     
     if not user:
+        # Zamanlama farkından e-posta tahmin edilmesin diye sahte doğrulama
+        verify_password(password, _DUMMY_HASH)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="E-posta veya şifre hatalı"
@@ -244,16 +371,17 @@ async def login(credentials: dict, db = Depends(get_db)):
             detail="E-posta veya şifre hatalı"
         )
     
-    # Hesap aktif mi?
-    if not user[7]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Hesap devre dışı"
+    # Eski hash'leri girişte sessizce Argon2id'ye taşı
+    if password_needs_rehash(user[3]):
+        cursor.execute(
+            "UPDATE users SET password_hash = ? WHERE id = ?",
+            (hash_password(password), user[0])
         )
+        db.commit()
     
     # Token oluştur
-    access_token = create_access_token(data={"sub": user[0]})
-    expires_in = ACCESS_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    access_token = create_access_token(data={"uid": user[0]})
+    expires_in = _EXPIRE_SECONDS
     
     return {
         "access_token": access_token,
@@ -266,24 +394,24 @@ async def login(credentials: dict, db = Depends(get_db)):
             "display_name": user[4],
             "avatar_url": user[5],
             "is_editor": bool(user[6]),
-            "created_at": user[8]
+            "created_at": user[7]
         }
     }
 
 @router.get("/me")
-async def get_me(current_user: dict = Depends(get_current_user)):
+def get_me(current_user: dict = Depends(get_current_user)):
     """
     Mevcut kullanıcı bilgilerini getir
     """
     return current_user
 
 @router.post("/refresh")
-async def refresh_token(current_user: dict = Depends(get_current_user)):
+def refresh_token(current_user: dict = Depends(get_current_user)):
     """
     Token yenile
     """
-    access_token = create_access_token(data={"sub": current_user["id"]})
-    expires_in = ACCESS_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    access_token = create_access_token(data={"uid": current_user["id"]})
+    expires_in = _EXPIRE_SECONDS
     
     return {
         "access_token": access_token,
@@ -3,21 +3,48 @@
 # =============================================
 
 from fastapi import APIRouter, HTTPException, Depends, status, Query
-from datetime import datetime
-from typing import Optional
+from fastapi.responses import ORJSONResponse
+from typing import Final, Optional
+import orjson
 
 from models.schemas import CommentCreate, CommentResponse, CommentListResponse, MessageResponse
-from database.connection import get_db
+from database.connection import current_timestamp, get_db
 from routers.auth import get_current_user, get_current_user_optional
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# =============================================
+# SQL
+# =============================================
+
+SQL_COMMENTS_PAGE: Final[str] = """
+    SELECT id, content, created_at, updated_at, user_id, COUNT(*) OVER () AS total
+    FROM comments
+    WHERE poll_id = ? AND is_active = 1
+    ORDER BY created_at DESC
+    LIMIT ? OFFSET ?
+"""
+
+SQL_COMMENTS_COUNT: Final[str] = "SELECT COUNT(*) FROM comments WHERE poll_id = ? AND is_active = 1"
+
+# Yazar id'leri tek JSON parametresiyle geçer, sorgu metni sayfa boyundan bağımsızdır
+SQL_COMMENT_AUTHORS: Final[str] = (
+    "SELECT id, username, display_name, avatar_url, is_editor FROM users "
+    "WHERE id IN (SELECT value FROM json_each(?))"
+)
+
+SQL_INSERT_COMMENT: Final[str] = """
+    INSERT INTO comments (user_id, poll_id, content, created_at, updated_at)
+    VALUES (?, ?, ?, datetime('now', 'localtime'), datetime('now', 'localtime'))
+    RETURNING id, created_at, updated_at
+"""
 
 # =============================================
 # API ENDPOINTS
 # =============================================
 
 @router.get("/poll/{poll_id}", response_model=CommentListResponse)
-async def get_comments(
+def get_comments(
     poll_id: int,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -38,57 +65,60 @@ async def get_comments(
             detail="Anket bulunamadı"
         )
     
-    # Toplam yorum sayısı
-    cursor.execute(
-        "SELECT COUNT(*) FROM comments WHERE poll_id = ? AND is_active = 1",
-        (poll_id,)
-    )
-    total = cursor.fetchone()[0]
-    
-    # Yorumları getir
-    cursor.execute(
-        """
-        SELECT 
-            c.id, c.content, c.created_at, c.updated_at,
-            u.id, u.username, u.display_name, u.avatar_url, u.is_editor
-        FROM comments c
-        JOIN users u ON c.user_id = u.id
-        WHERE c.poll_id = ? AND c.is_active = 1
-        ORDER BY c.created_at DESC
-        LIMIT ? OFFSET ?
-        """,
-        (poll_id, per_page, offset)
-    )
+    # Yorumları ve toplam sayıyı tek taramada getir (yazarlar ayrıca, tek sorguda)
+    cursor.execute(SQL_COMMENTS_PAGE, (poll_id, per_page, offset))
     
     comments_raw = cursor.fetchall()
     
-    comments = [
-        {
+    if comments_raw:
+        total = comments_raw[0][5]
+    elif offset:
+        # Sayfa aralık dışındaysa toplamı ayrıca say
+        cursor.execute(SQL_COMMENTS_COUNT, (poll_id,))
+        total = cursor.fetchone()[0]
+    else:
+        total = 0
+    
+    # Aynı kullanıcı sayfada birden çok yorum yapmış olabilir
+    user_ids = list({row[4] for row in comments_raw})
+    authors = {}
+    
+    if user_ids:
+        cursor.execute(SQL_COMMENT_AUTHORS, (orjson.dumps(user_ids).decode(),))
+        authors = {row[0]: row for row in cursor.fetchall()}
+    
+    comments = []
+    for row in comments_raw:
+        author = authors.get(row[4])
+        if not author:
+            continue
+        # Veri veritabanından geldiği için model kurulmadan dict olarak yazılır;
+        # datetime alanları Pydantic'in verdiği ISO biçimiyle aynı çıksın
+        comments.append({
             "id": row[0],
             "content": row[1],
-            "created_at": row[2],
-            "updated_at": row[3],
+            "created_at": row[2].replace(" ", "T", 1),
+            "updated_at": row[3].replace(" ", "T", 1) if row[3] else None,
             "user_id": row[4],
-            "username": row[5],
-            "display_name": row[6],
-            "avatar_url": row[7],
-            "is_editor": bool(row[8]),
+            "username": author[1],
+            "display_name": author[2],
+            "avatar_url": author[3],
+            "is_editor": bool(author[4]),
             "is_own": current_user["id"] == row[4] if current_user else False
-        }
-        for row in comments_raw
-    ]
+        })
     
-    return CommentListResponse(
-        comments=comments,
-        total=total,
-        page=page,
-        per_page=per_page,
-        has_next=offset + per_page < total,
-        has_prev=page > 1
-    )
+    # Response doğrudan döndürülür; response_model sadece dokümantasyon için
+    return ORJSONResponse({
+        "comments": comments,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "has_next": offset + per_page < total,
+        "has_prev": page > 1
+    })
 
 @router.post("", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
-async def create_comment(
+def create_comment(
     comment_data: CommentCreate,
     current_user: dict = Depends(get_current_user),
     db = Depends(get_db)
@@ -97,11 +127,10 @@ async def create_comment(
     Yorum yap
     """
     cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     # Anket var mı ve aktif mi?
     cursor.execute(
-        "SELECT id, expires_at FROM polls WHERE id = ?",
+        "SELECT id, expires_at > datetime('now', 'localtime') FROM polls WHERE id = ?",
         (comment_data.poll_id,)
     )
     poll = cursor.fetchone()
@@ -112,36 +141,27 @@ async def create_comment(
             detail="Anket bulunamadı"
         )
     
-    if poll[1] < now:
+    if not poll[1]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu anketin süresi dolmuş, yorum yapılamaz"
         )
     
-    # Yorumu oluştur
+    # Yorumu oluştur (zaman damgası SQLite tarafında basılır)
     cursor.execute(
-        """
-        INSERT INTO comments (user_id, poll_id, content, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (current_user["id"], comment_data.poll_id, comment_data.content, now, now)
+        SQL_INSERT_COMMENT,
+        (current_user["id"], comment_data.poll_id, comment_data.content)
     )
     
-    comment_id = cursor.lastrowid
-    
-    # Anket yorum sayısını güncelle
-    cursor.execute(
-        "UPDATE polls SET comments_count = comments_count + 1 WHERE id = ?",
-        (comment_data.poll_id,)
-    )
+    comment_id, created_at, updated_at = cursor.fetchone()
     
     db.commit()
     
     return {
         "id": comment_id,
         "content": comment_data.content,
-        "created_at": now,
-        "updated_at": now,
+        "created_at": created_at,
+        "updated_at": updated_at,
         "user_id": current_user["id"],
         "username": current_user["username"],
         "display_name": current_user["display_name"],
@@ -151,17 +171,17 @@ async def create_comment(
     }
 
 @router.put("/{comment_id}", response_model=CommentResponse)
-async def update_comment(
+def update_comment(
     comment_id: int,
     content: str = Query(..., min_length=1, max_length=1000),
     current_user: dict = Depends(get_current_user),
+    now: str = Depends(current_timestamp),
     db = Depends(get_db)
 ):
     """
     Yorumu düzenle (sadece kendi yorumu)
     """
     cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     # Yorum var mı?
     cursor.execute(
@@ -211,7 +231,7 @@ async def update_comment(
     }
 
 @router.delete("/{comment_id}", response_model=MessageResponse)
-async def delete_comment(
+def delete_comment(
     comment_id: int,
     current_user: dict = Depends(get_current_user),
     db = Depends(get_db)
@@ -241,18 +261,12 @@ async def delete_comment(
             detail="Bu yorumu silme yetkiniz yok"
         )
     
-    # Soft delete
+    # Soft delete (yorum sayacı trigger ile düşer)
     cursor.execute(
         "UPDATE comments SET is_active = 0 WHERE id = ?",
         (comment_id,)
     )
     
-    # Anket yorum sayısını güncelle
-    cursor.execute(
-        "UPDATE polls SET comments_count = comments_count - 1 WHERE id = ?",
-        (comment[2],)
-    )
-    
     db.commit()
     
     return MessageResponse(message="Yorum silindi")
\ No newline at end of file
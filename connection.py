@@ -3,25 +3,68 @@
 # =============================================
 
 import os
+import queue
 import sqlite3
 from contextlib import contextmanager
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # SQLite veritabanı dosyası
-DATABASE_PATH = os.path.join(os.path.dirname(__file__), "gercekmi.db")
+DATABASE_PATH = os.getenv("DATABASE_PATH") or os.path.join(os.path.dirname(__file__), "gercekmi.db")
 
-def get_connection():
-    """Veritabanı bağlantısı oluştur (thread-safe)"""
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
+# Havuzda tutulacak en fazla bağlantı sayısı
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+
+# Gerçek oy yüzdesi; okuma tarafında hesap yapılmasın diye polls üzerinde
+# VIRTUAL kolon olarak tanımlanır. Tamsayı bölmesi ROUND gibi yukarı yuvarlar
+GERCEK_PERCENTAGE_COLUMN = (
+    "gercek_percentage INTEGER GENERATED ALWAYS AS ("
+    "CASE WHEN (gercek_votes + efsane_votes) > 0 "
+    "THEN (gercek_votes * 200 + gercek_votes + efsane_votes) / ((gercek_votes + efsane_votes) * 2) "
+    "ELSE 50 END) VIRTUAL"
+)
+
+def _open_connection():
+    """Ayarları yapılmış yeni bir bağlantı aç"""
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False, cached_statements=256)
     conn.row_factory = sqlite3.Row  # Dict-like erişim
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MB sayfa cache'i
+    # Yazıcı meşgulken hemen SQLITE_BUSY dönmek yerine bekle
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    # Oy/beğeni/yorum satırları var olmayan ankete bağlanamasın
+    conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
+# Bağlantı havuzu: statement cache bağlantıya bağlı olduğu için
+# bağlantılar istekler arasında yeniden kullanılır
+_pool = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+def _acquire():
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return _open_connection()
+
+def _release(conn):
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+def get_connection():
+    """Veritabanı bağlantısı oluştur (thread-safe)"""
+    return _open_connection()
+
 def get_db():
-    """FastAPI dependency için veritabanı bağlantısı"""
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    """FastAPI dependency için veritabanı bağlantısı (havuzdan)"""
+    conn = _acquire()
     try:
         yield conn
         conn.commit()
@@ -29,13 +72,16 @@ def get_db():
         conn.rollback()
         raise e
     finally:
-        conn.close()
+        _release(conn)
+
+def current_timestamp() -> str:
+    """İstek zamanı; FastAPI dependency cache'i sayesinde istek başına bir kez hesaplanır"""
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
 @contextmanager
 def get_db_cursor(dict_cursor=True):
     """Context manager ile cursor al"""
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    conn = _acquire()
     cursor = conn.cursor()
     try:
         yield cursor
@@ -45,7 +91,7 @@ def get_db_cursor(dict_cursor=True):
         raise e
     finally:
         cursor.close()
-        conn.close()
+        _release(conn)
 
 def create_tables():
     """Tabloları oluştur"""
@@ -64,7 +110,9 @@ def create_tables():
             is_editor INTEGER DEFAULT 0,
             is_active INTEGER DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            total_votes_received INTEGER NOT NULL DEFAULT 0,
+            total_likes_received INTEGER NOT NULL DEFAULT 0
         )
     ''')
     
@@ -92,10 +140,32 @@ def create_tables():
             comments_count INTEGER DEFAULT 0,
             is_active INTEGER DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expires_at TIMESTAMP NOT NULL
+            expires_at TIMESTAMP NOT NULL,
+            ''' + GERCEK_PERCENTAGE_COLUMN + '''
         )
     ''')
     
+    # Eski veritabanlarına yüzde kolonunu ekle; VIRTUAL olduğu için tablo yeniden yazılmaz
+    cursor.execute("SELECT 1 FROM pragma_table_xinfo('polls') WHERE name = 'gercek_percentage'")
+    if not cursor.fetchone():
+        cursor.execute("ALTER TABLE polls ADD COLUMN " + GERCEK_PERCENTAGE_COLUMN)
+    
+    # Profil sayaçları eski veritabanlarına eklenir ve mevcut anketlerden doldurulur
+    cursor.execute("SELECT 1 FROM pragma_table_info('users') WHERE name = 'total_votes_received'")
+    if not cursor.fetchone():
+        cursor.execute("ALTER TABLE users ADD COLUMN total_votes_received INTEGER NOT NULL DEFAULT 0")
+        cursor.execute("ALTER TABLE users ADD COLUMN total_likes_received INTEGER NOT NULL DEFAULT 0")
+        cursor.execute('''
+            UPDATE users SET
+                total_votes_received = s.votes,
+                total_likes_received = s.likes
+            FROM (
+                SELECT user_id, SUM(gercek_votes + efsane_votes) AS votes, SUM(likes_count) AS likes
+                FROM polls GROUP BY user_id
+            ) AS s
+            WHERE users.id = s.user_id
+        ''')
+    
     # Votes tablosu
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS votes (
@@ -143,6 +213,174 @@ def create_tables():
         )
     ''')
     
+    # Indexler
+    indexes = [
+        "CREATE INDEX IF NOT EXISTS idx_comments_poll_active_created ON comments(poll_id, is_active, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_comments_user ON comments(user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_polls_active_expires ON polls(is_active, expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_votes_poll ON votes(poll_id)",
+        "CREATE INDEX IF NOT EXISTS idx_likes_poll ON likes(poll_id)",
+        "CREATE INDEX IF NOT EXISTS idx_polls_created ON polls(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_polls_expires_likes ON polls(expires_at, likes_count DESC, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_polls_category_expires ON polls(category_id, expires_at)",
+        "CREATE INDEX IF NOT EXISTS idx_polls_user ON polls(user_id, expires_at)",
+        # Kullanıcı anketleri sayfası: sıralama index'ten gelir, durum filtresi
+        # expires_at index'te olduğu için tabloya inmeden elenir
+        "CREATE INDEX IF NOT EXISTS idx_polls_user_created_expires ON polls(user_id, created_at DESC, id DESC, expires_at)",
+    ]
+    
+    # Yerini daha kapsayıcı bir index'e bırakanlar
+    obsolete_indexes = ["idx_polls_user_created"]
+    
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    index_names = {row[0] for row in cursor.fetchall()}
+    
+    for index_name in obsolete_indexes:
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+    
+    for index_sql in indexes:
+        cursor.execute(index_sql)
+    
+    # Index seti değiştiyse istatistikler yeniden toplanmalı
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    indexes_added = {row[0] for row in cursor.fetchall()} != index_names
+    
+    # Yorum sayacı triggerları (ekleme ve soft delete)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_comments_ins
+        AFTER INSERT ON comments
+        BEGIN
+            UPDATE polls SET comments_count = comments_count + 1 WHERE id = NEW.poll_id;
+        END
+    ''')
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_comments_soft_del
+        AFTER UPDATE OF is_active ON comments
+        WHEN OLD.is_active = 1 AND NEW.is_active = 0
+        BEGIN
+            UPDATE polls SET comments_count = comments_count - 1 WHERE id = NEW.poll_id;
+        END
+    ''')
+    
+    # Oy ve beğeni sayacı triggerları (sayaçlar satırla aynı transaction'da güncellenir)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_votes_ins
+        AFTER INSERT ON votes
+        BEGIN
+            UPDATE polls SET
+                gercek_votes = gercek_votes + (NEW.vote_type = 'gercek'),
+                efsane_votes = efsane_votes + (NEW.vote_type = 'efsane')
+            WHERE id = NEW.poll_id;
+        END
+    ''')
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_votes_upd
+        AFTER UPDATE OF vote_type ON votes
+        WHEN OLD.vote_type <> NEW.vote_type
+        BEGIN
+            UPDATE polls SET
+                gercek_votes = gercek_votes + (NEW.vote_type = 'gercek') - (OLD.vote_type = 'gercek'),
+                efsane_votes = efsane_votes + (NEW.vote_type = 'efsane') - (OLD.vote_type = 'efsane')
+            WHERE id = NEW.poll_id;
+        END
+    ''')
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_votes_del
+        AFTER DELETE ON votes
+        BEGIN
+            UPDATE polls SET
+                gercek_votes = gercek_votes - (OLD.vote_type = 'gercek'),
+                efsane_votes = efsane_votes - (OLD.vote_type = 'efsane')
+            WHERE id = OLD.poll_id;
+        END
+    ''')
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_likes_ins
+        AFTER INSERT ON likes
+        BEGIN
+            UPDATE polls SET likes_count = likes_count + 1 WHERE id = NEW.poll_id;
+        END
+    ''')
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_likes_del
+        AFTER DELETE ON likes
+        BEGIN
+            UPDATE polls SET likes_count = likes_count - 1 WHERE id = OLD.poll_id;
+        END
+    ''')
+    
+    # Anket sahibinin aldığı oy ve beğeni sayaçları (profil SUM taraması yapmasın)
+    owner_triggers = [
+        ("trg_votes_owner_ins", "AFTER INSERT ON votes",
+         "total_votes_received = total_votes_received + 1", "NEW.poll_id"),
+        ("trg_votes_owner_del", "AFTER DELETE ON votes",
+         "total_votes_received = total_votes_received - 1", "OLD.poll_id"),
+        ("trg_likes_owner_ins", "AFTER INSERT ON likes",
+         "total_likes_received = total_likes_received + 1", "NEW.poll_id"),
+        ("trg_likes_owner_del", "AFTER DELETE ON likes",
+         "total_likes_received = total_likes_received - 1", "OLD.poll_id"),
+    ]
+    
+    for trigger_name, event, assignment, poll_id in owner_triggers:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {trigger_name}
+            {event}
+            BEGIN
+                UPDATE users SET {assignment}
+                WHERE id = (SELECT user_id FROM polls WHERE id = {poll_id});
+            END
+        ''')
+    
+    # Silinen anketin oy ve beğenileri sahibinin toplamından düşülür
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_polls_owner_del
+        AFTER DELETE ON polls
+        BEGIN
+            UPDATE users SET
+                total_votes_received = total_votes_received - (OLD.gercek_votes + OLD.efsane_votes),
+                total_likes_received = total_likes_received - OLD.likes_count
+            WHERE id = OLD.user_id;
+        END
+    ''')
+    
+    # Uygulama sayaçları (/api/stats COUNT(*) taraması yapmasın)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS app_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    # İlk kurulumda mevcut satırlardan doldur, sonrasını triggerlar günceller
+    cursor.execute('''
+        INSERT OR IGNORE INTO app_counters (name, value)
+        SELECT 'total_users', COUNT(*) FROM users
+        UNION ALL SELECT 'total_polls', COUNT(*) FROM polls
+        UNION ALL SELECT 'total_votes', COUNT(*) FROM votes
+    ''')
+    
+    counter_triggers = [
+        ("trg_users_count_ins", "AFTER INSERT ON users", "total_users", "+ 1"),
+        ("trg_polls_count_ins", "AFTER INSERT ON polls", "total_polls", "+ 1"),
+        ("trg_polls_count_del", "AFTER DELETE ON polls", "total_polls", "- 1"),
+        ("trg_votes_count_ins", "AFTER INSERT ON votes", "total_votes", "+ 1"),
+        ("trg_votes_count_del", "AFTER DELETE ON votes", "total_votes", "- 1"),
+    ]
+    
+    for trigger_name, event, counter, delta in counter_triggers:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {trigger_name}
+            {event}
+            BEGIN
+                UPDATE app_counters SET value = value {delta} WHERE name = '{counter}';
+            END
+        ''')
+    
     # Varsayılan kategorileri ekle
     categories = [
         ('Ekonomi', '💰', '#10b981'),
@@ -155,10 +393,9 @@ def create_tables():
         ('Otomotiv', '🚗', '#8b5cf6'),
     ]
     
-    for name, icon, color in categories:
-        cursor.execute('''
-            INSERT OR IGNORE INTO categories (name, icon, color) VALUES (?, ?, ?)
-        ''', (name, icon, color))
+    cursor.executemany('''
+        INSERT OR IGNORE INTO categories (name, icon, color) VALUES (?, ?, ?)
+    ''', categories)
     
     # Editör kullanıcısı ekle (şifre: editor123)
     cursor.execute('''
@@ -167,6 +404,13 @@ def create_tables():
     ''', ('editor', 'editor@gercekmi.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/X4.VTtYr.Kj5Yu5Ky', 'Editör', 1))
     
     conn.commit()
+    
+    # İstatistikler yoksa veya yeni index geldiyse topla ki planlayıcı indexleri seçsin
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    if not cursor.fetchone() or indexes_added:
+        cursor.execute("ANALYZE")
+        conn.commit()
+    
     conn.close()
     print("✅ Veritabanı tabloları oluşturuldu")
 
@@ -4,26 +4,20 @@
 
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime, timedelta
-from typing import Optional
-import hashlib
-import sqlite3
-import jwt
+from fastapi.responses import ORJSONResponse
 import os
 
-# JWT ayarları
-SECRET_KEY = os.getenv("SECRET_KEY", "vottik-super-secret-key-2024")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_DAYS = 7
-
-# Database path
-DATABASE_PATH = "vottik.db"
+from database.connection import get_db, create_tables
+from routers.auth import (
+    ACCESS_TOKEN_EXPIRE_DAYS, hash_password, verify_password, create_access_token, decode_token
+)
 
 # FastAPI app
 app = FastAPI(
     title="Vottik API",
     description="Gerçek mi Efsane mi? Anket API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -39,144 +33,30 @@ app.add_middleware(
 # DATABASE
 # =============================================
 
-def get_db():
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
-
-def init_db():
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    # Users
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            display_name TEXT,
-            avatar_url TEXT,
-            is_editor INTEGER DEFAULT 0,
-            is_active INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Categories
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS categories (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            icon TEXT,
-            color TEXT
-        )
-    ''')
-    
-    # Polls
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS polls (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            category_id INTEGER,
-            question TEXT NOT NULL,
-            gercek_votes INTEGER DEFAULT 0,
-            efsane_votes INTEGER DEFAULT 0,
-            likes_count INTEGER DEFAULT 0,
-            comments_count INTEGER DEFAULT 0,
-            is_active INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expires_at TIMESTAMP
-        )
-    ''')
-    
-    # Votes
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS votes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            poll_id INTEGER,
-            vote_type TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id, poll_id)
-        )
-    ''')
-    
-    # Likes
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS likes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            poll_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(user_id, poll_id)
-        )
-    ''')
-    
-    # Comments
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS comments (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            poll_id INTEGER,
-            content TEXT NOT NULL,
-            is_active INTEGER DEFAULT 1,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Default categories
-    categories = [
-        ('Ekonomi', '💰', '#10b981'),
-        ('Teknoloji', '💻', '#6366f1'),
-        ('Spor', '⚽', '#f59e0b'),
-        ('Siyaset', '🏛️', '#ef4444'),
-        ('Eğlence', '🎬', '#ec4899'),
-        ('Sağlık', '🏥', '#14b8a6'),
-        ('Kripto', '₿', '#f97316'),
-        ('Otomotiv', '🚗', '#8b5cf6'),
-    ]
-    
-    for name, icon, color in categories:
-        cursor.execute('INSERT OR IGNORE INTO categories (name, icon, color) VALUES (?, ?, ?)', (name, icon, color))
-    
-    conn.commit()
-    conn.close()
-
-# Initialize DB on startup
-init_db()
+# Şema, bağlantı havuzu ve auth yardımcıları router'larla ortaktır
+create_tables()
 
 # =============================================
 # HELPERS
 # =============================================
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def create_token(user_id: int) -> str:
-    expire = datetime.utcnow() + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS)
-    return jwt.encode({"sub": str(user_id), "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
-
-def decode_token(token: str) -> Optional[int]:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return int(payload.get("sub"))
-    except:
-        return None
-
-def get_current_user(authorization: str = None, db = None):
+def get_token_user_id(authorization: str = None):
+    """Authorization header'ından kullanıcı id'sini çöz (veritabanına gitmeden)"""
     if not authorization or not authorization.startswith("Bearer "):
         return None
     token = authorization.replace("Bearer ", "")
-    user_id = decode_token(token)
+    payload = decode_token(token)
+    return payload.get("uid") if payload else None
+
+def get_current_user(authorization: str = None, db = None):
+    user_id = get_token_user_id(authorization)
     if not user_id:
         return None
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    return cursor.fetchone()
+    # Sadece gereken kolonlar; password_hash vb. hiç okunmaz
+    return db.execute(
+        "SELECT id, username, display_name, avatar_url, is_editor FROM users WHERE id = ?",
+        (user_id,)
+    ).fetchone()
 
 # =============================================
 # ROUTES
@@ -190,9 +70,30 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+# STATS
+@app.get("/api/stats")
+def get_stats(db = Depends(get_db)):
+    cursor = db.cursor()
+    
+    # Toplamlar triggerlarla tutulan sayaç tablosundan gelir
+    cursor.execute("SELECT name, value FROM app_counters")
+    stats = {row["name"]: row["value"] for row in cursor.fetchall()}
+    
+    # Zamana bağlı sayılar sayaçla tutulamaz, index aralığı üzerinden sayılır
+    cursor.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM polls WHERE is_active = 1 AND expires_at > datetime('now', 'localtime')),
+            (SELECT COUNT(*) FROM polls WHERE created_at >= date('now', 'localtime'))
+    """)
+    active_polls, today_polls = cursor.fetchone()
+    stats["active_polls"] = active_polls
+    stats["today_polls"] = today_polls
+    
+    return stats
+
 # AUTH
 @app.post("/api/auth/register")
-async def register(data: dict, db = Depends(get_db)):
+def register(data: dict, db = Depends(get_db)):
     cursor = db.cursor()
     username = data.get("username")
     email = data.get("email")
@@ -218,14 +119,14 @@ async def register(data: dict, db = Depends(get_db)):
     user_id = cursor.lastrowid
     
     return {
-        "access_token": create_token(user_id),
+        "access_token": create_access_token(data={"uid": user_id}),
         "token_type": "bearer",
         "expires_in": ACCESS_TOKEN_EXPIRE_DAYS * 86400,
         "user": {"id": user_id, "username": username, "email": email, "display_name": username, "is_editor": False}
     }
 
 @app.post("/api/auth/login")
-async def login(data: dict, db = Depends(get_db)):
+def login(data: dict, db = Depends(get_db)):
     cursor = db.cursor()
     email = data.get("email")
     password = data.get("password")
@@ -233,11 +134,11 @@ async def login(data: dict, db = Depends(get_db)):
     cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
     user = cursor.fetchone()
     
-    if not user or user["password_hash"] != hash_password(password):
+    if not user or not verify_password(password, user["password_hash"]):
         raise HTTPException(401, "Geçersiz email veya şifre")
     
     return {
-        "access_token": create_token(user["id"]),
+        "access_token": create_access_token(data={"uid": user["id"]}),
         "token_type": "bearer",
         "expires_in": ACCESS_TOKEN_EXPIRE_DAYS * 86400,
         "user": {"id": user["id"], "username": user["username"], "email": user["email"], "display_name": user["display_name"], "is_editor": bool(user["is_editor"])}
@@ -245,29 +146,28 @@ async def login(data: dict, db = Depends(get_db)):
 
 # CATEGORIES
 @app.get("/api/polls/categories")
-async def get_categories(db = Depends(get_db)):
+def get_categories(db = Depends(get_db)):
     cursor = db.cursor()
     cursor.execute("SELECT * FROM categories")
     return [dict(row) for row in cursor.fetchall()]
 
 # POLLS
 @app.get("/api/polls")
-async def get_polls(db = Depends(get_db)):
+def get_polls(db = Depends(get_db)):
     cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     cursor.execute("""
         SELECT p.*, u.username, u.display_name, u.is_editor, c.name as category_name, c.icon as category_icon
         FROM polls p
         JOIN users u ON p.user_id = u.id
         LEFT JOIN categories c ON p.category_id = c.id
-        WHERE p.expires_at > ?
+        WHERE p.expires_at > datetime('now', 'localtime')
         ORDER BY u.is_editor DESC, p.likes_count DESC
-    """, (now,))
+    """)
     polls = [dict(row) for row in cursor.fetchall()]
     return {"polls": polls, "total": len(polls), "page": 1, "per_page": 20, "has_next": False, "has_prev": False}
 
 @app.post("/api/polls")
-async def create_poll(data: dict, authorization: str = None, db = Depends(get_db)):
+def create_poll(data: dict, authorization: str = None, db = Depends(get_db)):
     cursor = db.cursor()
     
     if not authorization:
@@ -283,10 +183,19 @@ async def create_poll(data: dict, authorization: str = None, db = Depends(get_db
     if not question:
         raise HTTPException(400, "Soru gerekli")
     
-    expires_at = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d %H:%M:%S')
+    # Foreign key açık; var olmayan kategori IntegrityError yerine 400 dönsün
+    if category_id is not None:
+        cursor.execute("SELECT 1 FROM categories WHERE id = ?", (category_id,))
+        if not cursor.fetchone():
+            raise HTTPException(400, "Geçersiz kategori")
+    
+    # created_at da yerel saatle basılır; /api/stats bugünü yerel saatle sayar
     cursor.execute(
-        "INSERT INTO polls (user_id, category_id, question, expires_at) VALUES (?, ?, ?, ?)",
-        (user["id"], category_id, question, expires_at)
+        """
+        INSERT INTO polls (user_id, category_id, question, expires_at, created_at)
+        VALUES (?, ?, ?, datetime('now', 'localtime', '+7 days'), datetime('now', 'localtime'))
+        """,
+        (user["id"], category_id, question)
     )
     db.commit()
     
@@ -294,46 +203,54 @@ async def create_poll(data: dict, authorization: str = None, db = Depends(get_db
 
 # VOTES
 @app.post("/api/votes")
-async def vote(data: dict, authorization: str = None, db = Depends(get_db)):
-    cursor = db.cursor()
-    
+def vote(data: dict, authorization: str = None, db = Depends(get_db)):
     if not authorization:
         raise HTTPException(401, "Giriş yapmalısınız")
     
-    user = get_current_user(authorization, db)
-    if not user:
+    user_id = get_token_user_id(authorization)
+    if not user_id:
         raise HTTPException(401, "Geçersiz token")
     
     poll_id = data.get("poll_id")
     vote_type = data.get("vote_type")
     
-    # Mevcut oy var mı?
-    cursor.execute("SELECT * FROM votes WHERE user_id = ? AND poll_id = ?", (user["id"], poll_id))
-    existing = cursor.fetchone()
-    
-    if existing:
-        old_type = existing["vote_type"]
-        cursor.execute("UPDATE votes SET vote_type = ? WHERE id = ?", (vote_type, existing["id"]))
-        if old_type != vote_type:
-            if vote_type == "gercek":
-                cursor.execute("UPDATE polls SET gercek_votes = gercek_votes + 1, efsane_votes = efsane_votes - 1 WHERE id = ?", (poll_id,))
-            else:
-                cursor.execute("UPDATE polls SET efsane_votes = efsane_votes + 1, gercek_votes = gercek_votes - 1 WHERE id = ?", (poll_id,))
-    else:
-        cursor.execute("INSERT INTO votes (user_id, poll_id, vote_type) VALUES (?, ?, ?)", (user["id"], poll_id, vote_type))
-        if vote_type == "gercek":
-            cursor.execute("UPDATE polls SET gercek_votes = gercek_votes + 1 WHERE id = ?", (poll_id,))
-        else:
-            cursor.execute("UPDATE polls SET efsane_votes = efsane_votes + 1 WHERE id = ?", (poll_id,))
+    # Eksik tip hiçbir şey yazmadan 200, geçersiz tip CHECK ile 500 dönmesin
+    if vote_type not in ("gercek", "efsane"):
+        raise HTTPException(400, "Geçersiz oy tipi")
+    
+    # Kullanıcı kontrolü, anketin varlığı ve mevcut oy tipi tek sorguda
+    # (anket yoksa poll_exists, oy yoksa vote_type NULL)
+    user = db.execute(
+        """
+        SELECT u.id, p.id AS poll_exists, v.vote_type FROM users u
+        LEFT JOIN polls p ON p.id = ?
+        LEFT JOIN votes v ON v.user_id = u.id AND v.poll_id = p.id
+        WHERE u.id = ?
+        """,
+        (poll_id, user_id)
+    ).fetchone()
+    if not user:
+        raise HTTPException(401, "Geçersiz token")
+    if user["poll_exists"] is None:
+        raise HTTPException(404, "Anket bulunamadı")
+    old_type = user["vote_type"]
+    
+    # Anket sayaçlarını votes triggerları günceller
+    if old_type != vote_type:
+        db.execute(
+            """
+            INSERT INTO votes (user_id, poll_id, vote_type) VALUES (?, ?, ?)
+            ON CONFLICT (user_id, poll_id) DO UPDATE SET vote_type = excluded.vote_type
+            """,
+            (user["id"], poll_id, vote_type)
+        )
     
     db.commit()
     return {"poll_id": poll_id, "vote_type": vote_type, "message": "Oy kaydedildi"}
 
 # LIKES
 @app.post("/api/users/like/{poll_id}")
-async def like_poll(poll_id: int, authorization: str = None, db = Depends(get_db)):
-    cursor = db.cursor()
-    
+def like_poll(poll_id: int, authorization: str = None, db = Depends(get_db)):
     if not authorization:
         raise HTTPException(401, "Giriş yapmalısınız")
     
@@ -341,20 +258,26 @@ async def like_poll(poll_id: int, authorization: str = None, db = Depends(get_db
     if not user:
         raise HTTPException(401, "Geçersiz token")
     
-    cursor.execute("SELECT id FROM likes WHERE user_id = ? AND poll_id = ?", (user["id"], poll_id))
-    if cursor.fetchone():
+    # Sadece var olan ankete eklenir (sayaç trigger ile artar); satır
+    # eklenmediyse anket yok ya da zaten beğenilmiş
+    inserted = db.execute(
+        """
+        INSERT INTO likes (user_id, poll_id) SELECT ?, id FROM polls WHERE id = ?
+        ON CONFLICT (user_id, poll_id) DO NOTHING RETURNING 1
+        """,
+        (user["id"], poll_id)
+    ).fetchone()
+    if not inserted:
+        if not db.execute("SELECT 1 FROM polls WHERE id = ?", (poll_id,)).fetchone():
+            raise HTTPException(404, "Anket bulunamadı")
         raise HTTPException(400, "Zaten beğendiniz")
     
-    cursor.execute("INSERT INTO likes (user_id, poll_id) VALUES (?, ?)", (user["id"], poll_id))
-    cursor.execute("UPDATE polls SET likes_count = likes_count + 1 WHERE id = ?", (poll_id,))
     db.commit()
     
     return {"message": "Beğenildi"}
 
 @app.delete("/api/users/like/{poll_id}")
-async def unlike_poll(poll_id: int, authorization: str = None, db = Depends(get_db)):
-    cursor = db.cursor()
-    
+def unlike_poll(poll_id: int, authorization: str = None, db = Depends(get_db)):
     if not authorization:
         raise HTTPException(401, "Giriş yapmalısınız")
     
@@ -362,12 +285,34 @@ async def unlike_poll(poll_id: int, authorization: str = None, db = Depends(get_
     if not user:
         raise HTTPException(401, "Geçersiz token")
     
-    cursor.execute("DELETE FROM likes WHERE user_id = ? AND poll_id = ?", (user["id"], poll_id))
-    cursor.execute("UPDATE polls SET likes_count = likes_count - 1 WHERE id = ?", (poll_id,))
+    # Sayaç sadece gerçekten silinen satır için trigger ile düşer
+    deleted = db.execute(
+        "DELETE FROM likes WHERE user_id = ? AND poll_id = ? RETURNING 1",
+        (user["id"], poll_id)
+    ).fetchone()
+    if not deleted:
+        raise HTTPException(404, "Beğeni bulunamadı")
+    
     db.commit()
     
     return {"message": "Beğeni kaldırıldı"}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
+    port = int(os.getenv("PORT", 8000))
+    if os.getenv("DEV"):
+        # Geliştirme: dosya değişince yeniden başlat
+        uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    else:
+        # Production: C tabanlı event loop ve HTTP parser, her worker kendi DB havuzuyla
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            loop="uvloop",
+            http="httptools",
+            # Her worker ayrı süreçtir: process içi cache'ler sadece yazan
+            # worker'da silinir, diğerlerinde TTL dolana kadar eski kalır.
+            # Bu yüzden cevap cache'lerinin TTL'i birkaç saniyeyi geçmez
+            workers=int(os.getenv("WEB_CONCURRENCY", 2))
+        )
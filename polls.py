@@ -3,85 +3,179 @@
 # =============================================
 
 from fastapi import APIRouter, HTTPException, Depends, status, Query
-from datetime import datetime, timedelta
+from fastapi.responses import ORJSONResponse, Response
 from typing import Optional, List
+import threading
+from cachetools import TTLCache
 
 from models.schemas import (
     PollCreate, PollResponse, PollListResponse, MessageResponse
 )
 from database.connection import get_db
 from routers.auth import get_current_user, get_current_user_optional
+from routers.users import invalidate_profile
 
-router = APIRouter()
+# Router hangi app'e bağlanırsa bağlansın response'lar orjson ile yazılır
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Anket süresi (7 gün)
 POLL_DURATION_DAYS = 7
 # Günlük anket limiti
 DAILY_POLL_LIMIT = 2
 
+# Anonim liste cache'i: (nesil, sayfa, sayfa boyu, kategori, arşiv) -> hazır JSON body.
+# Anket eklenip silinince nesil artar; oy/beğeni sayıları en fazla TTL kadar gecikir
+_POLL_LIST_CACHE = TTLCache(maxsize=128, ttl=2)
+_POLL_LIST_CACHE_LOCK = threading.Lock()
+_poll_list_generation = 0
+
+# =============================================
+# SQL
+# =============================================
+
+# Anket satırı kolonları; "şimdi" SQLite tarafında yerel saatle hesaplanır
+_POLL_SELECT = """
+        SELECT 
+            p.id, p.question, p.gercek_votes, p.efsane_votes,
+            p.likes_count, p.comments_count, p.created_at, p.expires_at, p.is_active,
+            u.id as user_id, u.username, u.display_name, u.avatar_url, u.is_editor,
+            c.id as category_id, c.name as category_name, c.icon as category_icon,
+            p.gercek_percentage,
+            CAST((julianday(p.expires_at) - julianday('now', 'localtime')) * 86400 AS INTEGER) AS seconds_left,
+            {user_columns}
+        FROM polls p
+        JOIN users u ON p.user_id = u.id
+        LEFT JOIN categories c ON p.category_id = c.id
+        {user_joins}
+"""
+
+# Kullanıcının oyu ve beğenisi join ile eklenir (iki parametre: user_id, user_id);
+# UNIQUE(user_id, poll_id) indexleri bu eşleşmeyi karşılar
+POLL_SELECT_USER = _POLL_SELECT.format(
+    user_columns="v.vote_type AS user_vote, l.id IS NOT NULL AS user_liked",
+    user_joins="""LEFT JOIN votes v ON v.poll_id = p.id AND v.user_id = ?
+        LEFT JOIN likes l ON l.poll_id = p.id AND l.user_id = ?"""
+)
+POLL_SELECT_ANON = _POLL_SELECT.format(
+    user_columns="NULL AS user_vote, 0 AS user_liked",
+    user_joins=""
+)
+
+# Liste filtreleri: (include_archived, kategori var mı) -> WHERE eki
+_POLL_FILTERS = {
+    (False, False): " AND p.expires_at > datetime('now', 'localtime')",
+    (False, True): " AND p.expires_at > datetime('now', 'localtime') AND p.category_id = ?",
+    (True, False): "",
+    (True, True): " AND p.category_id = ?",
+}
+
+_POLL_LIST_ORDER = """
+        ORDER BY u.is_editor DESC, p.likes_count DESC, p.created_at DESC
+        LIMIT ? OFFSET ?
+"""
+
+# Her filtre şekli için sorgu metni bir kez üretilir ki statement cache hep isabet etsin
+POLL_LIST_SQL = {
+    (with_user, *shape): (POLL_SELECT_USER if with_user else POLL_SELECT_ANON)
+    + "        WHERE 1=1" + where + _POLL_LIST_ORDER
+    for with_user in (False, True)
+    for shape, where in _POLL_FILTERS.items()
+}
+
+# _POLL_SELECT kolon sırası
+_POLL_COLUMNS = (
+    "id", "question", "gercek_votes", "efsane_votes",
+    "likes_count", "comments_count", "created_at", "expires_at", "is_active",
+    "user_id", "username", "display_name", "avatar_url", "is_editor",
+    "category_id", "category_name", "category_icon",
+    "gercek_percentage", "seconds_left",
+)
+
+def _json_field(column: str) -> str:
+    """Kolonu json_object içinde response'taki tipiyle üret"""
+    if column in ("is_active", "is_editor"):
+        return f"'{column}', json(CASE WHEN {column} THEN 'true' ELSE 'false' END)"
+    if column in ("created_at", "expires_at"):
+        return f"'{column}', replace({column}, ' ', 'T')"
+    return f"'{column}', {column}"
+
+# Anonim listeler için JSON dizisi doğrudan SQLite'ta üretilir
+# (_to_list_item ile aynı alanlar, satır başına Python işi yok)
+_POLL_JSON_LIST = """
+        SELECT json_group_array(json_object(
+            {fields},
+            'efsane_percentage', 100 - gercek_percentage,
+            'total_votes', gercek_votes + efsane_votes,
+            'is_expired', json(CASE WHEN seconds_left <= 0 THEN 'true' ELSE 'false' END),
+            'user_vote', NULL,
+            'user_liked', json('false')
+        ))
+        FROM ({{inner}})
+""".format(fields=",\n            ".join(_json_field(c) for c in _POLL_COLUMNS))
+
+TRENDING_JSON_SQL = _POLL_JSON_LIST.format(inner=POLL_SELECT_ANON + """
+        WHERE p.expires_at > datetime('now', 'localtime')
+        ORDER BY (p.gercek_votes + p.efsane_votes + p.likes_count) DESC
+        LIMIT ?
+""")
+
+ENDING_SOON_JSON_SQL = _POLL_JSON_LIST.format(inner=POLL_SELECT_ANON + """
+        WHERE p.expires_at > datetime('now', 'localtime')
+          AND p.expires_at < datetime('now', 'localtime', '+1 day')
+        ORDER BY p.expires_at ASC
+        LIMIT ?
+""")
+
+POLL_BY_ID_SQL = POLL_SELECT_ANON + "        WHERE p.id = ?"
+POLL_BY_ID_USER_SQL = POLL_SELECT_USER + "        WHERE p.id = ?"
+
+POLL_COUNT_SQL = {
+    shape: "SELECT COUNT(*) FROM polls p WHERE 1=1" + where
+    for shape, where in _POLL_FILTERS.items()
+}
+
 # =============================================
 # YARDIMCI FONKSİYONLAR
 # =============================================
 
 def format_poll_response(poll_row, user_vote: str = None, user_liked: bool = False) -> dict:
     """Veritabanı satırını PollResponse formatına çevir"""
-    # SQLite Row objesini dict gibi kullan
-    if hasattr(poll_row, 'keys'):
-        return {
-            "id": poll_row["id"],
-            "question": poll_row["question"],
-            "gercek_votes": poll_row["gercek_votes"],
-            "efsane_votes": poll_row["efsane_votes"],
-            "likes_count": poll_row["likes_count"],
-            "comments_count": poll_row["comments_count"],
-            "created_at": poll_row["created_at"],
-            "expires_at": poll_row["expires_at"],
-            "is_active": bool(poll_row["is_active"]),
-            "user_id": poll_row["user_id"],
-            "username": poll_row["username"],
-            "display_name": poll_row["display_name"],
-            "avatar_url": poll_row["avatar_url"],
-            "is_editor": bool(poll_row["is_editor"]),
-            "category_id": poll_row["category_id"],
-            "category_name": poll_row["category_name"],
-            "category_icon": poll_row["category_icon"],
-            "gercek_percentage": poll_row["gercek_percentage"] if poll_row["gercek_percentage"] else 50,
-            "seconds_left": poll_row["seconds_left"],
-            "user_vote": user_vote,
-            "user_liked": user_liked
-        }
-    else:
-        return {
-            "id": poll_row[0],
-            "question": poll_row[1],
-            "gercek_votes": poll_row[2],
-            "efsane_votes": poll_row[3],
-            "likes_count": poll_row[4],
-            "comments_count": poll_row[5],
-            "created_at": poll_row[6],
-            "expires_at": poll_row[7],
-            "is_active": bool(poll_row[8]),
-            "user_id": poll_row[9],
-            "username": poll_row[10],
-            "display_name": poll_row[11],
-            "avatar_url": poll_row[12],
-            "is_editor": bool(poll_row[13]),
-            "category_id": poll_row[14],
-            "category_name": poll_row[15],
-            "category_icon": poll_row[16],
-            "gercek_percentage": poll_row[17] if poll_row[17] else 50,
-            "seconds_left": poll_row[18],
-            "user_vote": user_vote,
-            "user_liked": user_liked
-        }
+    # Satır pozisyonel okunur; fazladan kolonlar (user_vote, user_liked) zip'te düşer
+    poll = dict(zip(_POLL_COLUMNS, poll_row))
+    poll["is_active"] = bool(poll["is_active"])
+    poll["is_editor"] = bool(poll["is_editor"])
+    poll["user_vote"] = user_vote
+    poll["user_liked"] = user_liked
+    return poll
+
+def _to_list_item(poll: dict) -> dict:
+    """PollResponse validator'larının ürettiği alanları doğrudan ekle (doğrulamasız liste için)"""
+    poll["efsane_percentage"] = 100 - poll["gercek_percentage"]
+    poll["total_votes"] = poll["gercek_votes"] + poll["efsane_votes"]
+    poll["is_expired"] = poll["seconds_left"] is not None and poll["seconds_left"] <= 0
+    # datetime alanları Pydantic'in verdiği ISO biçimiyle aynı çıksın
+    poll["created_at"] = poll["created_at"].replace(" ", "T", 1)
+    poll["expires_at"] = poll["expires_at"].replace(" ", "T", 1)
+    return poll
+
+def _build_poll_filters(include_archived: bool, category_id: Optional[int]):
+    """Liste ve sayım sorgularının ortak filtre şeklini ve parametrelerini oluştur"""
+    shape = (bool(include_archived), bool(category_id))
+    # Arşiv filtresi parametre almaz, sadece kategori bağlanır
+    params = [category_id] if category_id else []
+    return shape, params
+
+def invalidate_poll_list_cache():
+    """Anonim liste cache'ini geçersiz kıl (anket eklendi/silindi)"""
+    global _poll_list_generation
+    with _POLL_LIST_CACHE_LOCK:
+        _poll_list_generation += 1
 
 def check_daily_limit(cursor, user_id: int) -> int:
     """Kullanıcının günlük anket limitini kontrol et, kalan hakkı döndür"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    
     cursor.execute(
-        "SELECT poll_count FROM daily_poll_limits WHERE user_id = ? AND poll_date = ?",
-        (user_id, today)
+        "SELECT poll_count FROM daily_poll_limits WHERE user_id = ? AND poll_date = date('now', 'localtime')",
+        (user_id,)
     )
     result = cursor.fetchone()
     
@@ -91,16 +185,14 @@ def check_daily_limit(cursor, user_id: int) -> int:
 
 def increment_daily_count(cursor, user_id: int):
     """Günlük anket sayısını artır"""
-    today = datetime.now().strftime('%Y-%m-%d')
-    
     cursor.execute(
         """
         INSERT INTO daily_poll_limits (user_id, poll_date, poll_count)
-        VALUES (?, ?, 1)
+        VALUES (?, date('now', 'localtime'), 1)
         ON CONFLICT (user_id, poll_date) 
         DO UPDATE SET poll_count = poll_count + 1
         """,
-        (user_id, today)
+        (user_id,)
     )
 
 # =============================================
@@ -108,7 +200,7 @@ def increment_daily_count(cursor, user_id: int):
 # =============================================
 
 @router.get("", response_model=PollListResponse)
-async def get_polls(
+def get_polls(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
     category_id: Optional[int] = None,
@@ -119,99 +211,55 @@ async def get_polls(
     """
     Anketleri listele
     """
-    cursor = db.cursor()
     offset = (page - 1) * per_page
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    # Base query - SQLite uyumlu
-    base_query = """
-        SELECT 
-            p.id, p.question, p.gercek_votes, p.efsane_votes,
-            p.likes_count, p.comments_count, p.created_at, p.expires_at, p.is_active,
-            u.id as user_id, u.username, u.display_name, u.avatar_url, u.is_editor,
-            c.id as category_id, c.name as category_name, c.icon as category_icon,
-            CASE 
-                WHEN (p.gercek_votes + p.efsane_votes) > 0 
-                THEN ROUND((CAST(p.gercek_votes AS FLOAT) / (p.gercek_votes + p.efsane_votes)) * 100)
-                ELSE 50 
-            END AS gercek_percentage,
-            (julianday(p.expires_at) - julianday(?)) * 86400 AS seconds_left
-        FROM polls p
-        JOIN users u ON p.user_id = u.id
-        LEFT JOIN categories c ON p.category_id = c.id
-        WHERE 1=1
-    """
     
-    params = [now]
+    # Anonim isteklerde herkes aynı cevabı görür, kısa süreli cache'ten dön
+    if current_user is None:
+        with _POLL_LIST_CACHE_LOCK:
+            cache_key = (_poll_list_generation, page, per_page, category_id, include_archived)
+            body = _POLL_LIST_CACHE.get(cache_key)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
     
-    # Arşiv filtresi
-    if not include_archived:
-        base_query += " AND p.expires_at > ?"
-        params.append(now)
+    shape, filter_params = _build_poll_filters(include_archived, category_id)
     
-    # Kategori filtresi
-    if category_id:
-        base_query += " AND p.category_id = ?"
-        params.append(category_id)
+    # Toplam sayı (join ve hesaplanan kolonlar olmadan, sadece filtreler)
+    total = db.execute(POLL_COUNT_SQL[shape], filter_params).fetchone()[0]
     
-    # Toplam sayı
-    count_query = f"SELECT COUNT(*) FROM ({base_query})"
-    cursor.execute(count_query, params)
-    total = cursor.fetchone()[0]
-    
-    # Sıralama ve pagination
-    base_query += """
-        ORDER BY u.is_editor DESC, p.likes_count DESC, p.created_at DESC
-        LIMIT ? OFFSET ?
-    """
+    params = [current_user["id"], current_user["id"]] if current_user else []
+    params.extend(filter_params)
     params.extend([per_page, offset])
     
-    cursor.execute(base_query, params)
-    polls_raw = cursor.fetchall()
+    polls_raw = db.execute(POLL_LIST_SQL[(current_user is not None, *shape)], params).fetchall()
     
-    # Kullanıcı oyları ve beğenileri
-    user_votes = {}
-    user_likes = set()
-    
-    if current_user and polls_raw:
-        poll_ids = [p[0] for p in polls_raw]
-        placeholders = ','.join('?' * len(poll_ids))
-        
-        # Oylar
-        cursor.execute(
-            f"SELECT poll_id, vote_type FROM votes WHERE user_id = ? AND poll_id IN ({placeholders})",
-            [current_user["id"]] + poll_ids
-        )
-        user_votes = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        # Beğeniler
-        cursor.execute(
-            f"SELECT poll_id FROM likes WHERE user_id = ? AND poll_id IN ({placeholders})",
-            [current_user["id"]] + poll_ids
-        )
-        user_likes = {row[0] for row in cursor.fetchall()}
-    
-    # Response oluştur
+    # Response oluştur (veri veritabanından geldiği için Pydantic doğrulaması atlanır;
+    # response_model sadece dokümantasyon için)
     polls = [
-        format_poll_response(
+        _to_list_item(format_poll_response(
             poll,
-            user_vote=user_votes.get(poll[0]),
-            user_liked=poll[0] in user_likes
-        )
+            user_vote=poll[19],
+            user_liked=bool(poll[20])
+        ))
         for poll in polls_raw
     ]
     
-    return PollListResponse(
-        polls=polls,
-        total=total,
-        page=page,
-        per_page=per_page,
-        has_next=offset + per_page < total,
-        has_prev=page > 1
-    )
+    response = ORJSONResponse({
+        "polls": polls,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "has_next": offset + per_page < total,
+        "has_prev": page > 1
+    })
+    
+    if current_user is None:
+        with _POLL_LIST_CACHE_LOCK:
+            _POLL_LIST_CACHE[cache_key] = response.body
+    
+    return response
 
 @router.get("/trending")
-async def get_trending_polls(
+def get_trending_polls(
     limit: int = Query(10, ge=1, le=50),
     current_user: Optional[dict] = Depends(get_current_user_optional),
     db = Depends(get_db)
@@ -219,75 +267,22 @@ async def get_trending_polls(
     """
     Trend anketleri getir
     """
-    cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    cursor.execute(
-        """
-        SELECT 
-            p.id, p.question, p.gercek_votes, p.efsane_votes,
-            p.likes_count, p.comments_count, p.created_at, p.expires_at, p.is_active,
-            u.id as user_id, u.username, u.display_name, u.avatar_url, u.is_editor,
-            c.id as category_id, c.name as category_name, c.icon as category_icon,
-            CASE 
-                WHEN (p.gercek_votes + p.efsane_votes) > 0 
-                THEN ROUND((CAST(p.gercek_votes AS FLOAT) / (p.gercek_votes + p.efsane_votes)) * 100)
-                ELSE 50 
-            END AS gercek_percentage,
-            (julianday(p.expires_at) - julianday(?)) * 86400 AS seconds_left
-        FROM polls p
-        JOIN users u ON p.user_id = u.id
-        LEFT JOIN categories c ON p.category_id = c.id
-        WHERE p.expires_at > ?
-        ORDER BY (p.gercek_votes + p.efsane_votes + p.likes_count) DESC
-        LIMIT ?
-        """,
-        (now, now, limit)
-    )
-    
-    polls_raw = cursor.fetchall()
-    return [format_poll_response(poll) for poll in polls_raw]
+    polls_json = db.execute(TRENDING_JSON_SQL, (limit,)).fetchone()[0]
+    return Response(content=polls_json, media_type="application/json")
 
 @router.get("/ending-soon")
-async def get_ending_soon_polls(
+def get_ending_soon_polls(
     limit: int = Query(10, ge=1, le=50),
     db = Depends(get_db)
 ):
     """
     Süresi yakında dolacak anketleri getir
     """
-    cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    tomorrow = (datetime.now() + timedelta(hours=24)).strftime('%Y-%m-%d %H:%M:%S')
-    
-    cursor.execute(
-        """
-        SELECT 
-            p.id, p.question, p.gercek_votes, p.efsane_votes,
-            p.likes_count, p.comments_count, p.created_at, p.expires_at, p.is_active,
-            u.id as user_id, u.username, u.display_name, u.avatar_url, u.is_editor,
-            c.id as category_id, c.name as category_name, c.icon as category_icon,
-            CASE 
-                WHEN (p.gercek_votes + p.efsane_votes) > 0 
-                THEN ROUND((CAST(p.gercek_votes AS FLOAT) / (p.gercek_votes + p.efsane_votes)) * 100)
-                ELSE 50 
-            END AS gercek_percentage,
-            (julianday(p.expires_at) - julianday(?)) * 86400 AS seconds_left
-        FROM polls p
-        JOIN users u ON p.user_id = u.id
-        LEFT JOIN categories c ON p.category_id = c.id
-        WHERE p.expires_at > ? AND p.expires_at < ?
-        ORDER BY p.expires_at ASC
-        LIMIT ?
-        """,
-        (now, now, tomorrow, limit)
-    )
-    
-    polls_raw = cursor.fetchall()
-    return [format_poll_response(poll) for poll in polls_raw]
+    polls_json = db.execute(ENDING_SOON_JSON_SQL, (limit,)).fetchone()[0]
+    return Response(content=polls_json, media_type="application/json")
 
 @router.get("/categories")
-async def get_categories(db = Depends(get_db)):
+def get_categories(db = Depends(get_db)):
     """
     Tüm kategorileri getir
     """
@@ -300,7 +295,7 @@ async def get_categories(db = Depends(get_db)):
     ]
 
 @router.get("/my-limit")
-async def get_my_poll_limit(
+def get_my_poll_limit(
     current_user: dict = Depends(get_current_user),
     db = Depends(get_db)
 ):
@@ -317,7 +312,7 @@ async def get_my_poll_limit(
     }
 
 @router.get("/{poll_id}", response_model=PollResponse)
-async def get_poll(
+def get_poll(
     poll_id: int,
     current_user: Optional[dict] = Depends(get_current_user_optional),
     db = Depends(get_db)
@@ -325,31 +320,14 @@ async def get_poll(
     """
     Tek bir anketi getir
     """
-    cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    cursor.execute(
-        """
-        SELECT 
-            p.id, p.question, p.gercek_votes, p.efsane_votes,
-            p.likes_count, p.comments_count, p.created_at, p.expires_at, p.is_active,
-            u.id as user_id, u.username, u.display_name, u.avatar_url, u.is_editor,
-            c.id as category_id, c.name as category_name, c.icon as category_icon,
-            CASE 
-                WHEN (p.gercek_votes + p.efsane_votes) > 0 
-                THEN ROUND((CAST(p.gercek_votes AS FLOAT) / (p.gercek_votes + p.efsane_votes)) * 100)
-                ELSE 50 
-            END AS gercek_percentage,
-            (julianday(p.expires_at) - julianday(?)) * 86400 AS seconds_left
-        FROM polls p
-        JOIN users u ON p.user_id = u.id
-        LEFT JOIN categories c ON p.category_id = c.id
-        WHERE p.id = ?
-        """,
-        (now, poll_id)
-    )
-    
-    poll = cursor.fetchone()
+    # Kullanıcının oyu ve beğenisi aynı sorguda join ile gelir
+    if current_user:
+        poll = db.execute(
+            POLL_BY_ID_USER_SQL,
+            (current_user["id"], current_user["id"], poll_id)
+        ).fetchone()
+    else:
+        poll = db.execute(POLL_BY_ID_SQL, (poll_id,)).fetchone()
     
     if not poll:
         raise HTTPException(
@@ -357,29 +335,10 @@ async def get_poll(
             detail="Anket bulunamadı"
         )
     
-    # Kullanıcı oyu ve beğenisi
-    user_vote = None
-    user_liked = False
-    
-    if current_user:
-        cursor.execute(
-            "SELECT vote_type FROM votes WHERE user_id = ? AND poll_id = ?",
-            (current_user["id"], poll_id)
-        )
-        vote_result = cursor.fetchone()
-        if vote_result:
-            user_vote = vote_result[0]
-        
-        cursor.execute(
-            "SELECT id FROM likes WHERE user_id = ? AND poll_id = ?",
-            (current_user["id"], poll_id)
-        )
-        user_liked = cursor.fetchone() is not None
-    
-    return format_poll_response(poll, user_vote=user_vote, user_liked=user_liked)
+    return format_poll_response(poll, user_vote=poll[19], user_liked=bool(poll[20]))
 
 @router.post("", response_model=PollResponse, status_code=status.HTTP_201_CREATED)
-async def create_poll(
+def create_poll(
     poll_data: PollCreate,
     current_user: dict = Depends(get_current_user),
     db = Depends(get_db)
@@ -406,25 +365,25 @@ async def create_poll(
             detail="Geçersiz kategori"
         )
     
-    # Anketi oluştur
-    expires_at = (datetime.now() + timedelta(days=POLL_DURATION_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
-    created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
+    # Anketi oluştur (zaman damgaları SQLite tarafında basılır)
     cursor.execute(
         """
         INSERT INTO polls (user_id, category_id, question, expires_at, created_at)
-        VALUES (?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, datetime('now', 'localtime', ?), datetime('now', 'localtime'))
+        RETURNING id, created_at, expires_at
         """,
-        (current_user["id"], poll_data.category_id, poll_data.question, expires_at, created_at)
+        (current_user["id"], poll_data.category_id, poll_data.question, f"+{POLL_DURATION_DAYS} days")
     )
     
-    poll_id = cursor.lastrowid
+    poll_id, created_at, expires_at = cursor.fetchone()
     
     # Günlük sayacı artır (editör değilse)
     if not current_user.get("is_editor"):
         increment_daily_count(cursor, current_user["id"])
     
     db.commit()
+    invalidate_poll_list_cache()
+    invalidate_profile(current_user["username"])
     
     # Kategori bilgisini al
     cursor.execute("SELECT id, name, icon FROM categories WHERE id = ?", (poll_data.category_id,))
@@ -455,7 +414,7 @@ async def create_poll(
     }
 
 @router.delete("/{poll_id}", response_model=MessageResponse)
-async def delete_poll(
+def delete_poll(
     poll_id: int,
     current_user: dict = Depends(get_current_user),
     db = Depends(get_db)
@@ -466,7 +425,10 @@ async def delete_poll(
     cursor = db.cursor()
     
     # Anketi bul
-    cursor.execute("SELECT user_id FROM polls WHERE id = ?", (poll_id,))
+    cursor.execute(
+        "SELECT p.user_id, u.username FROM polls p JOIN users u ON u.id = p.user_id WHERE p.id = ?",
+        (poll_id,)
+    )
     poll = cursor.fetchone()
     
     if not poll:
@@ -482,8 +444,14 @@ async def delete_poll(
             detail="Bu anketi silme yetkiniz yok"
         )
     
-    # Sil
+    # Sil; foreign key açık olduğu için önce bağlı satırlar silinir
+    # (oy ve beğeni triggerları sayaçları da düşürür)
+    cursor.execute("DELETE FROM votes WHERE poll_id = ?", (poll_id,))
+    cursor.execute("DELETE FROM likes WHERE poll_id = ?", (poll_id,))
+    cursor.execute("DELETE FROM comments WHERE poll_id = ?", (poll_id,))
     cursor.execute("DELETE FROM polls WHERE id = ?", (poll_id,))
     db.commit()
+    invalidate_poll_list_cache()
+    invalidate_profile(poll[1])
     
     return MessageResponse(message="Anket başarıyla silindi")
\ No newline at end of file
@@ -122,6 +122,9 @@ CREATE INDEX idx_comments_poll_id ON comments(poll_id);
 CREATE INDEX idx_comments_user_id ON comments(user_id);
 CREATE INDEX idx_comments_created_at ON comments(created_at DESC);
 
+-- Yorum listesini sıralamadan çekmek için composite index
+CREATE INDEX idx_comments_poll_active_created ON comments(poll_id, is_active, created_at DESC);
+
 -- =============================================
 -- VARSAYILAN VERİLER
 -- =============================================
@@ -108,7 +108,7 @@ class PollResponse(BaseModel):
     gercek_percentage: int = 50
     efsane_percentage: int = 50
     total_votes: int = 0
-    seconds_left: Optional[float] = None
+    seconds_left: Optional[int] = None
     is_expired: bool = False
     
     # Kullanıcıya özel (opsiyonel)
@@ -136,11 +136,14 @@ class PollResponse(BaseModel):
 
 class PollListResponse(BaseModel):
     polls: List[PollResponse]
-    total: int
+    # Sayım istenmediğinde (with_total=false) None
+    total: Optional[int]
     page: int
     per_page: int
     has_next: bool
     has_prev: bool
+    # Keyset sayfalama destekleyen endpointlerde sonraki sayfa için
+    next_cursor: Optional[str] = None
 
 # =============================================
 # OY MODELLERİ
@@ -156,6 +159,7 @@ class VoteResponse(BaseModel):
     poll_id: int
     vote_type: str
     created_at: datetime
+    message: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -202,9 +206,28 @@ class CommentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CommentRow(BaseModel):
+    """Yorum listesi satırı (handler dict olarak üretir, model dokümantasyon içindir)"""
+    id: int
+    content: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+    
+    # Kullanıcı bilgileri
+    user_id: int
+    username: str
+    display_name: Optional[str]
+    avatar_url: Optional[str]
+    is_editor: bool
+    is_own: bool = False
+
 class CommentListResponse(BaseModel):
-    comments: List[CommentResponse]
+    comments: List[CommentRow]
     total: int
+    page: int
+    per_page: int
+    has_next: bool
+    has_prev: bool
 
 # =============================================
 # AUTH MODELLERİ
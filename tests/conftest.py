@@ -0,0 +1,72 @@
+# =============================================
+# Test ortamı - Paket yapısı ve geçici veritabanı
+# =============================================
+
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modüller README'deki paket yapısından import edilir (database/, models/,
+# routers/); dosyalar geçici bir klasörde bu yapıya bağlanır
+_LAYOUT = {
+    "database": ["connection.py"],
+    "models": ["schemas.py"],
+    "routers": ["auth.py", "polls.py", "votes.py", "comments.py", "users.py"],
+}
+
+_tmp = Path(tempfile.mkdtemp(prefix="vottik-test-"))
+for package, files in _LAYOUT.items():
+    (_tmp / package).mkdir()
+    (_tmp / package / "__init__.py").touch()
+    for name in files:
+        (_tmp / package / name).symlink_to(ROOT / name)
+(_tmp / "main.py").symlink_to(ROOT / "main.py")
+
+os.environ["DATABASE_PATH"] = str(_tmp / "test.db")
+# Testlerde hash maliyeti düşük tutulur
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_COST", "8192")
+sys.path.insert(0, str(_tmp))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402  (tabloları oluşturur)
+from routers import auth, comments, polls, users, votes  # noqa: E402
+
+@pytest.fixture(scope="session")
+def app_client():
+    """main.py'deki Railway uygulaması"""
+    return TestClient(main.app)
+
+@pytest.fixture(scope="session")
+def api_client():
+    """Router'ların README'deki prefix'lerle bağlandığı uygulama"""
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/auth")
+    app.include_router(polls.router, prefix="/api/polls")
+    app.include_router(votes.router, prefix="/api/votes")
+    app.include_router(comments.router, prefix="/api/comments")
+    app.include_router(users.router, prefix="/api/users")
+    return TestClient(app)
+
+@pytest.fixture
+def register_user(api_client):
+    """Benzersiz bir kullanıcı kaydedip (cevap, Authorization header) döndür"""
+    def _register():
+        name = "u" + uuid.uuid4().hex[:12]
+        response = api_client.post("/api/auth/register", json={
+            "username": name,
+            "email": f"{name}@example.com",
+            "password": "secret123",
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return body, {"Authorization": f"Bearer {body['access_token']}"}
+    return _register
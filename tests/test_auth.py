@@ -0,0 +1,39 @@
+import uuid
+
+
+def test_register_returns_user_with_created_at(api_client):
+    name = "u" + uuid.uuid4().hex[:12]
+    response = api_client.post("/api/auth/register", json={
+        "username": name,
+        "email": f"{name}@example.com",
+        "password": "secret123",
+    })
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["token_type"] == "bearer"
+    assert body["access_token"]
+    assert body["user"]["username"] == name
+    assert body["user"]["email"] == f"{name}@example.com"
+    assert body["user"]["is_editor"] is False
+    assert body["user"]["created_at"]
+
+    me = api_client.get("/api/auth/me", headers={"Authorization": f"Bearer {body['access_token']}"})
+    assert me.status_code == 200
+    assert me.json()["id"] == body["user"]["id"]
+
+
+def test_register_reports_email_conflict_first(api_client, register_user):
+    # Kullanıcı adı önce eklenen satırda, e-posta sonrakinde: SQLite hangisini
+    # önce bulursa bulsun e-posta çakışması döner
+    taken_name, _ = register_user()
+    taken_email, _ = register_user()
+
+    response = api_client.post("/api/auth/register", json={
+        "username": taken_name["user"]["username"],
+        "email": taken_email["user"]["email"],
+        "password": "secret123",
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Bu e-posta adresi zaten kullanılıyor"
@@ -0,0 +1,24 @@
+from database.connection import get_db_cursor
+
+
+def test_comment_list_uses_iso_datetimes(api_client, register_user):
+    user, headers = register_user()
+    poll = api_client.post("/api/polls", headers=headers, json={"question": "Yorum sorusu?", "category_id": 1}).json()
+
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO comments (user_id, poll_id, content, created_at, updated_at) "
+            "VALUES (?, ?, 'İlk yorum', '2026-01-02 03:04:05', '2026-01-02 03:04:05')",
+            (user["user"]["id"], poll["id"])
+        )
+
+    response = api_client.get(f"/api/comments/poll/{poll['id']}", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["has_next"], body["has_prev"]) == (1, False, False)
+
+    comment = body["comments"][0]
+    assert comment["content"] == "İlk yorum"
+    assert comment["is_own"] is True
+    # Anket listeleri ve profille aynı ISO biçimi
+    assert comment["created_at"] == comment["updated_at"] == "2026-01-02T03:04:05"
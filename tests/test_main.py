@@ -0,0 +1,91 @@
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def main_auth(app_client):
+    """main.py üzerinden kayıt olup authorization parametresini döndür"""
+    name = "m" + uuid.uuid4().hex[:12]
+    response = app_client.post("/api/auth/register", json={
+        "username": name,
+        "email": f"{name}@example.com",
+        "password": "secret123",
+    })
+    assert response.status_code == 200, response.text
+    return {"authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_create_poll_with_unknown_category_is_rejected(app_client, main_auth):
+    response = app_client.post(
+        "/api/polls", params=main_auth, json={"question": "Soru?", "category_id": 999999}
+    )
+    assert response.status_code == 400
+
+
+def test_create_poll_without_category(app_client, main_auth):
+    response = app_client.post("/api/polls", params=main_auth, json={"question": "Soru?"})
+    assert response.status_code == 200
+    assert response.json()["id"]
+
+
+def test_vote_on_missing_poll_returns_404(app_client, main_auth):
+    response = app_client.post(
+        "/api/votes", params=main_auth, json={"poll_id": 999999, "vote_type": "gercek"}
+    )
+    assert response.status_code == 404
+
+
+def test_like_missing_poll_returns_404(app_client, main_auth):
+    response = app_client.post("/api/users/like/999999", params=main_auth)
+    assert response.status_code == 404
+
+
+def test_like_twice_returns_400(app_client, main_auth):
+    poll_id = app_client.post(
+        "/api/polls", params=main_auth, json={"question": "Soru?", "category_id": 1}
+    ).json()["id"]
+
+    assert app_client.post(f"/api/users/like/{poll_id}", params=main_auth).status_code == 200
+    assert app_client.post(f"/api/users/like/{poll_id}", params=main_auth).status_code == 400
+
+
+def test_router_vote_and_like_on_missing_poll_return_404(api_client, register_user):
+    _, headers = register_user()
+
+    response = api_client.post("/api/votes", headers=headers, json={"poll_id": 999999, "vote_type": "gercek"})
+    assert response.status_code == 404
+
+    response = api_client.post("/api/users/like/999999", headers=headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("body", [{}, {"vote_type": "belki"}])
+def test_vote_with_missing_or_invalid_type_is_rejected(app_client, main_auth, body):
+    poll_id = app_client.post(
+        "/api/polls", params=main_auth, json={"question": "Soru?", "category_id": 1}
+    ).json()["id"]
+
+    response = app_client.post("/api/votes", params=main_auth, json={"poll_id": poll_id, **body})
+    assert response.status_code == 400
+
+
+def test_create_poll_stamps_local_created_at(app_client, main_auth, monkeypatch):
+    import time
+
+    from database.connection import get_db_cursor
+
+    # UTC ile yerel saat farklı olsun ki varsayılan CURRENT_TIMESTAMP yakalansın
+    monkeypatch.setenv("TZ", "Etc/GMT-3")
+    time.tzset()
+    try:
+        poll_id = app_client.post("/api/polls", params=main_auth, json={"question": "Soru?"}).json()["id"]
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "SELECT abs(julianday(created_at) - julianday('now', 'localtime')) * 86400 FROM polls WHERE id = ?",
+                (poll_id,)
+            )
+            assert cursor.fetchone()[0] < 60
+    finally:
+        monkeypatch.undo()
+        time.tzset()
@@ -0,0 +1,56 @@
+from database.connection import get_db_cursor
+from routers.polls import invalidate_poll_list_cache
+
+
+def test_zero_gercek_percentage_matches_across_endpoints(api_client, register_user):
+    owner_body, owner = register_user()
+    poll = api_client.post("/api/polls", headers=owner, json={"question": "Sıfır yüzde sorusu?", "category_id": 1}).json()
+
+    _, voter = register_user()
+    response = api_client.post("/api/votes", headers=voter, json={"poll_id": poll["id"], "vote_type": "efsane"})
+    assert response.status_code == 200, response.text
+
+    # Süresi bir günden az kalsın ki ending-soon listesine de girsin
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "UPDATE polls SET expires_at = datetime('now', 'localtime', '+1 hour') WHERE id = ?",
+            (poll["id"],)
+        )
+    invalidate_poll_list_cache()
+
+    def find(polls):
+        return next(p for p in polls if p["id"] == poll["id"])
+
+    detail = api_client.get(f"/api/polls/{poll['id']}").json()
+    listed = find(api_client.get("/api/polls", params={"per_page": 100}).json()["polls"])
+    trending = find(api_client.get("/api/polls/trending", params={"limit": 50}).json())
+    ending_soon = find(api_client.get("/api/polls/ending-soon", params={"limit": 50}).json())
+    user_polls = find(api_client.get(f"/api/users/{owner_body['user']['username']}/polls").json()["polls"])
+
+    # Sadece efsane oyu olan anket 0/100 görünür, oysuz anket 50/50 kalır
+    for item in (detail, listed, trending, ending_soon, user_polls):
+        assert item["efsane_votes"] == 1
+        assert item["gercek_percentage"] == 0
+        assert item["efsane_percentage"] == 100
+
+
+def test_poll_without_votes_is_even(api_client, register_user):
+    _, owner = register_user()
+    poll = api_client.post("/api/polls", headers=owner, json={"question": "Oysuz anket sorusu?", "category_id": 1}).json()
+
+    detail = api_client.get(f"/api/polls/{poll['id']}").json()
+    assert (detail["gercek_percentage"], detail["efsane_percentage"]) == (50, 50)
+
+
+def test_json_lists_match_poll_list_items(api_client, register_user):
+    _, owner = register_user()
+    poll = api_client.post("/api/polls", headers=owner, json={"question": "Alan karşılaştırma?", "category_id": 1}).json()
+    invalidate_poll_list_cache()
+
+    listed = next(p for p in api_client.get("/api/polls", params={"per_page": 100}).json()["polls"] if p["id"] == poll["id"])
+    trending = next(p for p in api_client.get("/api/polls/trending", params={"limit": 50}).json() if p["id"] == poll["id"])
+
+    # seconds_left istekler arasında kayabilir
+    listed.pop("seconds_left")
+    trending.pop("seconds_left")
+    assert trending == listed
@@ -0,0 +1,60 @@
+import pytest
+
+
+@pytest.fixture
+def poll(api_client, register_user):
+    """Yeni bir kullanıcının açtığı anket"""
+    _, headers = register_user()
+    response = api_client.post("/api/polls", headers=headers, json={"question": "Test sorusu burada?", "category_id": 1})
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def test_vote_messages_distinguish_new_changed_and_repeated(api_client, register_user, poll):
+    _, headers = register_user()
+
+    def cast(vote_type):
+        response = api_client.post("/api/votes", headers=headers, json={"poll_id": poll["id"], "vote_type": vote_type})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    first = cast("gercek")
+    assert first["message"] == "Oyunuz kaydedildi"
+
+    # Aynı saniye içinde değiştirilse de değişiklik olarak raporlanır
+    changed = cast("efsane")
+    assert changed["message"] == "Oyunuz değiştirildi"
+    assert changed["id"] == first["id"]
+
+    repeated = cast("efsane")
+    assert repeated["message"] == "Zaten bu şekilde oy vermişsiniz"
+
+    detail = api_client.get(f"/api/polls/{poll['id']}").json()
+    assert (detail["gercek_votes"], detail["efsane_votes"]) == (0, 1)
+
+
+def test_vote_on_expired_poll_is_rejected(api_client, register_user, poll):
+    from database.connection import get_db_cursor
+
+    with get_db_cursor() as cursor:
+        cursor.execute("UPDATE polls SET expires_at = '2000-01-01 00:00:00' WHERE id = ?", (poll["id"],))
+
+    _, headers = register_user()
+    response = api_client.post("/api/votes", headers=headers, json={"poll_id": poll["id"], "vote_type": "gercek"})
+    assert response.status_code == 400
+
+
+def test_my_vote_follows_vote_changes(api_client, register_user, poll):
+    _, headers = register_user()
+    my_vote = f"/api/votes/{poll['id']}/my-vote"
+
+    assert api_client.get(my_vote, headers=headers).json()["vote_type"] is None
+
+    api_client.post("/api/votes", headers=headers, json={"poll_id": poll["id"], "vote_type": "gercek"})
+    assert api_client.get(my_vote, headers=headers).json()["vote_type"] == "gercek"
+
+    api_client.post("/api/votes", headers=headers, json={"poll_id": poll["id"], "vote_type": "efsane"})
+    assert api_client.get(my_vote, headers=headers).json()["vote_type"] == "efsane"
+
+    api_client.delete(f"/api/votes/{poll['id']}", headers=headers)
+    assert api_client.get(my_vote, headers=headers).json()["vote_type"] is None
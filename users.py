@@ -2,110 +2,119 @@
 # Users Router - Kullanıcı İşlemleri (SQLite Uyumlu)
 # =============================================
 
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status, Query
+from fastapi.responses import ORJSONResponse
 from datetime import datetime
-from typing import Optional
+from typing import Final, Optional
+import base64
+import hashlib
+import threading
+import orjson
+from cachetools import TTLCache
 
 from models.schemas import UserProfile, MessageResponse, PollListResponse
-from database.connection import get_db
-from routers.auth import get_current_user, get_current_user_optional
+from database.connection import current_timestamp, get_db
+from routers.auth import get_current_user, get_current_user_optional, invalidate_user
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Kullanıcı adı -> (profil JSON gövdesi, ETag); oy/beğeni/anket değişikliklerinde
+# anket sahibi için silinir. Silme sadece yazan worker'da olur, diğer worker'lar
+# eski ETag'e 304 dönmeye devam etmesin diye TTL birkaç saniyede tutulur
+_PROFILE_CACHE = TTLCache(maxsize=10000, ttl=2)
+_PROFILE_CACHE_LOCK = threading.Lock()
+
+# (kullanıcı adı, filtre, sayfa, sayfa boyu, cursor, with_total) -> izleyiciden bağımsız sayfa;
+# aynı sebeple ve aktif/arşiv ayrımı zamanla değiştiği için TTL kısa tutulur
+_USER_POLLS_CACHE = TTLCache(maxsize=1024, ttl=2)
 
 # =============================================
-# API ENDPOINTS
+# SQL
 # =============================================
 
-@router.get("/{username}", response_model=UserProfile)
-async def get_user_profile(
-    username: str,
-    db = Depends(get_db)
-):
-    """
-    Kullanıcı profilini getir
-    """
-    cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    # Kullanıcıyı bul
-    cursor.execute(
-        """
-        SELECT id, username, display_name, avatar_url, is_editor, created_at
-        FROM users 
-        WHERE username = ? AND is_active = 1
-        """,
-        (username,)
-    )
-    user = cursor.fetchone()
+# İzleyicinin sayfadaki oyları ve beğenileri; vote_type NOT NULL olduğundan
+# NULL dönen satırlar beğenileri ayırır
+SQL_VIEWER_VOTES_LIKES: Final[str] = """
+    SELECT v.poll_id, v.vote_type FROM votes v
+    JOIN json_each(?) j ON v.poll_id = j.value
+    WHERE v.user_id = ?
+    UNION ALL
+    SELECT l.poll_id, NULL FROM likes l
+    JOIN json_each(?) j ON l.poll_id = j.value
+    WHERE l.user_id = ?
+"""
+
+# Profil güncelleme ifadeleri (display_name verildi mi, avatar_url verildi mi)
+# anahtarıyla önceden hazır; her istek aynı metni kullanır
+PROFILE_UPDATE_SQL: Final[dict] = {
+    (True, False): "UPDATE users SET display_name = ?, updated_at = ? WHERE id = ?",
+    (False, True): "UPDATE users SET avatar_url = ?, updated_at = ? WHERE id = ?",
+    (True, True): "UPDATE users SET display_name = ?, avatar_url = ?, updated_at = ? WHERE id = ?",
+}
+
+# =============================================
+# YARDIMCI FONKSİYONLAR
+# =============================================
+
+def invalidate_profile(username: str):
+    """Kullanıcının cache'teki profilini ve anket sayfalarını sil"""
+    with _PROFILE_CACHE_LOCK:
+        _PROFILE_CACHE.pop(username, None)
+        stale = [key for key in _USER_POLLS_CACHE.keys() if key[0] == username]
+        for key in stale:
+            _USER_POLLS_CACHE.pop(key, None)
+
+def ensure_poll_open(cursor, poll_id: int, now: str):
+    """Anket yoksa 404, süresi dolmuşsa 400 fırlat"""
+    cursor.execute("SELECT expires_at FROM polls WHERE id = ?", (poll_id,))
+    poll = cursor.fetchone()
     
-    if not user:
+    if not poll:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Kullanıcı bulunamadı"
+            detail="Anket bulunamadı"
         )
     
-    user_id = user[0]
-    
-    # Toplam anket sayısı
-    cursor.execute(
-        "SELECT COUNT(*) FROM polls WHERE user_id = ?",
-        (user_id,)
-    )
-    total_polls = cursor.fetchone()[0]
-    
-    # Aktif anket sayısı
-    cursor.execute(
-        "SELECT COUNT(*) FROM polls WHERE user_id = ? AND expires_at > ?",
-        (user_id, now)
-    )
-    active_polls = cursor.fetchone()[0]
-    
-    # Toplam aldığı oy sayısı
-    cursor.execute(
-        """
-        SELECT COALESCE(SUM(gercek_votes + efsane_votes), 0) 
-        FROM polls WHERE user_id = ?
-        """,
-        (user_id,)
-    )
-    total_votes_received = cursor.fetchone()[0]
+    if poll[0] < now:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bu anketin süresi dolmuş"
+        )
+
+def _json_etag(body: bytes) -> str:
+    """JSON gövdesinden güçlü ETag üret"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _etag_response(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    """İstemcideki kopya güncelse gövdesiz 304, değilse JSON gövdesini dön"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
     
-    # Toplam aldığı beğeni sayısı
-    cursor.execute(
-        "SELECT COALESCE(SUM(likes_count), 0) FROM polls WHERE user_id = ?",
-        (user_id,)
-    )
-    total_likes_received = cursor.fetchone()[0]
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return {
-        "id": user[0],
-        "username": user[1],
-        "display_name": user[2],
-        "avatar_url": user[3],
-        "is_editor": bool(user[4]),
-        "created_at": user[5],
-        "total_polls": total_polls,
-        "active_polls": active_polls,
-        "archived_polls": total_polls - active_polls,
-        "total_votes_received": total_votes_received,
-        "total_likes_received": total_likes_received
-    }
+    return Response(content=body, media_type="application/json", headers=headers)
 
-@router.get("/{username}/polls", response_model=PollListResponse)
-async def get_user_polls(
-    username: str,
-    page: int = Query(1, ge=1),
-    per_page: int = Query(20, ge=1, le=100),
-    status_filter: Optional[str] = Query(None, pattern="^(active|archived)$"),
-    current_user: Optional[dict] = Depends(get_current_user_optional),
-    db = Depends(get_db)
-):
-    """
-    Kullanıcının anketlerini getir
-    """
-    cursor = db.cursor()
+def _encode_cursor(created_at: str, poll_id: int) -> str:
+    """Sayfanın son anketinden opak keyset cursor'ı üret"""
+    return base64.urlsafe_b64encode(orjson.dumps([created_at, poll_id])).decode()
+
+def _decode_cursor(token: str):
+    """Cursor'ı (created_at, id) ikilisine çöz"""
+    try:
+        created_at, poll_id = orjson.loads(base64.urlsafe_b64decode(token.encode()))
+        return str(created_at), int(poll_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz cursor"
+        )
+
+def _fetch_user_polls_page(cursor, username: str, page: int, per_page: int,
+                           status_filter: Optional[str], page_cursor: Optional[str], now: str,
+                           with_total: bool) -> dict:
+    """Kullanıcının anket sayfasını izleyiciye özel alanlar olmadan getir"""
     offset = (page - 1) * per_page
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     # Kullanıcıyı bul
     cursor.execute(
@@ -129,59 +138,55 @@ async def get_user_polls(
             p.likes_count, p.comments_count, p.created_at, p.expires_at, p.is_active,
             u.id as user_id, u.username, u.display_name, u.avatar_url, u.is_editor,
             c.id as category_id, c.name as category_name, c.icon as category_icon,
-            CASE 
-                WHEN (p.gercek_votes + p.efsane_votes) > 0 
-                THEN ROUND((CAST(p.gercek_votes AS FLOAT) / (p.gercek_votes + p.efsane_votes)) * 100)
-                ELSE 50 
-            END AS gercek_percentage,
-            (julianday(p.expires_at) - julianday(?)) * 86400 AS seconds_left
+            p.gercek_percentage
         FROM polls p
         JOIN users u ON p.user_id = u.id
         LEFT JOIN categories c ON p.category_id = c.id
         WHERE p.user_id = ?
     """
     
-    params = [now, user_id]
+    params = [user_id]
+    
+    # Sayım sorgusu join ve hesaplanan kolonlar olmadan sadece filtreleri kullanır
+    count_query = "SELECT COUNT(*) FROM polls p WHERE p.user_id = ?"
+    count_params = [user_id]
     
     # Status filtresi
+    status_clause = ""
     if status_filter == "active":
-        base_query += " AND p.expires_at > ?"
-        params.append(now)
+        status_clause = " AND p.expires_at > ?"
     elif status_filter == "archived":
-        base_query += " AND p.expires_at <= ?"
-        params.append(now)
-    
-    # Toplam sayı
-    count_query = f"SELECT COUNT(*) FROM ({base_query})"
-    cursor.execute(count_query, params)
-    total = cursor.fetchone()[0]
+        status_clause = " AND p.expires_at <= ?"
     
-    # Sıralama ve pagination
-    base_query += " ORDER BY p.created_at DESC LIMIT ? OFFSET ?"
-    params.extend([per_page, offset])
+    if status_clause:
+        base_query += status_clause
+        params.append(now)
+        count_query += status_clause
+        count_params.append(now)
+    
+    # Toplam sayı sadece istenirse; sonraki sayfa bilgisi fazladan çekilen satırdan gelir
+    total = None
+    if with_total:
+        cursor.execute(count_query, count_params)
+        total = cursor.fetchone()[0]
+    
+    # Sıralama ve pagination: cursor varsa keyset, yoksa klasik OFFSET.
+    # Bir fazla satır çekilir ki sonraki sayfa olup olmadığı bilinsin
+    if page_cursor:
+        base_query += " AND (p.created_at, p.id) < (?, ?)"
+        params.extend(_decode_cursor(page_cursor))
+        base_query += " ORDER BY p.created_at DESC, p.id DESC LIMIT ?"
+        params.append(per_page + 1)
+    else:
+        base_query += " ORDER BY p.created_at DESC, p.id DESC LIMIT ? OFFSET ?"
+        params.extend([per_page + 1, offset])
     
     cursor.execute(base_query, params)
     polls_raw = cursor.fetchall()
     
-    # Kullanıcı oyları ve beğenileri
-    user_votes = {}
-    user_likes = set()
-    
-    if current_user and polls_raw:
-        poll_ids = [p[0] for p in polls_raw]
-        placeholders = ','.join('?' * len(poll_ids))
-        
-        cursor.execute(
-            f"SELECT poll_id, vote_type FROM votes WHERE user_id = ? AND poll_id IN ({placeholders})",
-            [current_user["id"]] + poll_ids
-        )
-        user_votes = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        cursor.execute(
-            f"SELECT poll_id FROM likes WHERE user_id = ? AND poll_id IN ({placeholders})",
-            [current_user["id"]] + poll_ids
-        )
-        user_likes = {row[0] for row in cursor.fetchall()}
+    has_next = len(polls_raw) > per_page
+    polls_raw = polls_raw[:per_page]
+    next_cursor = _encode_cursor(polls_raw[-1][6], polls_raw[-1][0]) if has_next else None
     
     polls = [
         {
@@ -202,84 +207,213 @@ async def get_user_polls(
             "category_id": poll[14],
             "category_name": poll[15],
             "category_icon": poll[16],
-            "gercek_percentage": poll[17] if poll[17] else 50,
-            "seconds_left": poll[18],
-            "user_vote": user_votes.get(poll[0]),
-            "user_liked": poll[0] in user_likes
+            "gercek_percentage": poll[17]
         }
         for poll in polls_raw
     ]
     
-    return PollListResponse(
-        polls=polls,
-        total=total,
-        page=page,
-        per_page=per_page,
-        has_next=offset + per_page < total,
-        has_prev=page > 1
-    )
+    return {
+        "polls": polls,
+        "total": total,
+        "has_next": has_next,
+        "next_cursor": next_cursor
+    }
 
-@router.post("/like/{poll_id}", response_model=MessageResponse)
-async def like_poll(
-    poll_id: int,
-    current_user: dict = Depends(get_current_user),
+# =============================================
+# API ENDPOINTS
+# =============================================
+
+@router.get("/{username}", response_model=UserProfile)
+def get_user_profile(
+    username: str,
+    request: Request,
     db = Depends(get_db)
 ):
     """
-    Anketi beğen
+    Kullanıcı profilini getir
+    
+    Cevap ETag taşır; If-None-Match tutarsa 304 döner.
     """
+    with _PROFILE_CACHE_LOCK:
+        cached = _PROFILE_CACHE.get(username)
+    if cached is not None:
+        return _etag_response(request, *cached, "no-cache")
+    
     cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    # Anket var mı?
+    # Alınan oy/beğeni toplamları users üzerindeki trigger sayaçlarından okunur;
+    # anket sayıları idx_polls_user üzerinde sadece index sayımıdır
     cursor.execute(
-        "SELECT id, expires_at FROM polls WHERE id = ?",
-        (poll_id,)
+        """
+        SELECT u.id, u.username, u.display_name, u.avatar_url, u.is_editor, u.created_at,
+               (SELECT COUNT(*) FROM polls WHERE user_id = u.id),
+               (SELECT COUNT(*) FROM polls WHERE user_id = u.id AND expires_at > datetime('now', 'localtime')),
+               u.total_votes_received,
+               u.total_likes_received
+        FROM users u
+        WHERE u.username = ? AND u.is_active = 1
+        """,
+        (username,)
     )
-    poll = cursor.fetchone()
+    user = cursor.fetchone()
     
-    if not poll:
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Anket bulunamadı"
+            detail="Kullanıcı bulunamadı"
         )
     
-    # Süre dolmuş mu?
-    if poll[1] < now:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu anketin süresi dolmuş"
+    total_polls = user[6]
+    active_polls = user[7]
+    
+    profile = {
+        "id": user[0],
+        "username": user[1],
+        "display_name": user[2],
+        "avatar_url": user[3],
+        "is_editor": bool(user[4]),
+        "created_at": user[5],
+        "total_polls": total_polls,
+        "active_polls": active_polls,
+        "archived_polls": total_polls - active_polls,
+        "total_votes_received": user[8],
+        "total_likes_received": user[9]
+    }
+    
+    # Serileştirilmiş gövde cache'lenir, sonraki isteklerde tekrar üretilmez;
+    # created_at Pydantic'in verdiği ISO biçimiyle aynı çıksın
+    profile["created_at"] = profile["created_at"].replace(" ", "T", 1)
+    body = orjson.dumps(profile)
+    etag = _json_etag(body)
+    
+    with _PROFILE_CACHE_LOCK:
+        _PROFILE_CACHE[username] = (body, etag)
+    
+    return _etag_response(request, body, etag, "no-cache")
+
+@router.get("/{username}/polls", response_model=PollListResponse)
+def get_user_polls(
+    username: str,
+    request: Request,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    status_filter: Optional[str] = Query(None, pattern="^(active|archived)$"),
+    page_cursor: Optional[str] = Query(None, alias="cursor"),
+    with_total: bool = Query(True),
+    current_user: Optional[dict] = Depends(get_current_user_optional),
+    now: str = Depends(current_timestamp),
+    db = Depends(get_db)
+):
+    """
+    Kullanıcının anketlerini getir
+    
+    - **cursor**: Önceki cevabın next_cursor değeri verilirse sayfa OFFSET
+      yerine (created_at, id) üzerinden aranır ve page yok sayılır
+    - **with_total**: false verilirse COUNT sorgusu atlanır ve total null döner
+    
+    Cevap ETag taşır; If-None-Match tutarsa 304 döner.
+    """
+    # Sayfanın herkese ortak kısmı izleyiciden bağımsız anahtarla cache'lenir;
+    # user_vote/user_liked asla cache'e girmez, her istekte üstüne eklenir
+    cache_key = (username, status_filter, page, per_page, page_cursor, with_total)
+    with _PROFILE_CACHE_LOCK:
+        shared = _USER_POLLS_CACHE.get(cache_key)
+    
+    cursor = db.cursor()
+    
+    if shared is None:
+        shared = _fetch_user_polls_page(
+            cursor, username, page, per_page, status_filter, page_cursor, now, with_total
         )
+        with _PROFILE_CACHE_LOCK:
+            _USER_POLLS_CACHE[cache_key] = shared
+    
+    # Kullanıcı oyları ve beğenileri
+    user_votes = {}
+    user_likes = set()
+    
+    if current_user and shared["polls"]:
+        # Id listesi tek JSON parametresi olarak geçer; sayfa boyu değişse de
+        # sorgu metni aynı kalır ve statement cache'ten gelir
+        poll_ids = orjson.dumps([p["id"] for p in shared["polls"]]).decode()
+        
+        # Oylar ve beğeniler tek sorguda: vote_type NULL ise satır beğenidir
+        cursor.execute(SQL_VIEWER_VOTES_LIKES, (poll_ids, current_user["id"], poll_ids, current_user["id"]))
+        for poll_id, vote_type in cursor.fetchall():
+            if vote_type is None:
+                user_likes.add(poll_id)
+            else:
+                user_votes[poll_id] = vote_type
+    
+    # Cache'teki dict'ler değiştirilmez, kopyalarına eklenir. Kalan süre her
+    # istekte Python'da hesaplanır, böylece cache'ten gelen sayfa da güncel olur
+    now_ts = datetime.fromisoformat(now).timestamp()
+    polls = [
+        {
+            **poll,
+            "seconds_left": int(datetime.fromisoformat(poll["expires_at"]).timestamp() - now_ts),
+            "user_vote": user_votes.get(poll["id"]),
+            "user_liked": poll["id"] in user_likes
+        }
+        for poll in shared["polls"]
+    ]
+    
+    body = orjson.dumps(PollListResponse(
+        polls=polls,
+        total=shared["total"],
+        page=page,
+        per_page=per_page,
+        has_next=shared["has_next"],
+        has_prev=page > 1 or page_cursor is not None,
+        next_cursor=shared["next_cursor"]
+    ).model_dump(mode="json"))
+    
+    # Gövde izleyicinin oy/beğenisini içerdiği için sadece tarayıcıda tutulur
+    return _etag_response(request, body, _json_etag(body), "private, no-cache")
+
+@router.post("/like/{poll_id}", response_model=MessageResponse)
+def like_poll(
+    poll_id: int,
+    current_user: dict = Depends(get_current_user),
+    now: str = Depends(current_timestamp),
+    db = Depends(get_db)
+):
+    """
+    Anketi beğen
+    """
+    cursor = db.cursor()
     
-    # Zaten beğenmiş mi?
+    # Anket kontrolü ve beğeni tek ifadede (sayacı trigger günceller); anket
+    # sahibinin kullanıcı adı profil cache'i için aynı ifadeden döner
     cursor.execute(
-        "SELECT id FROM likes WHERE user_id = ? AND poll_id = ?",
-        (current_user["id"], poll_id)
+        """
+        INSERT INTO likes (user_id, poll_id, created_at)
+        SELECT ?, p.id, ? FROM polls p WHERE p.id = ? AND p.expires_at >= ?
+        ON CONFLICT(user_id, poll_id) DO NOTHING
+        RETURNING (
+            SELECT u.username FROM polls p JOIN users u ON u.id = p.user_id
+            WHERE p.id = likes.poll_id
+        )
+        """,
+        (current_user["id"], now, poll_id, now)
     )
-    if cursor.fetchone():
+    like = cursor.fetchone()
+    
+    # Satır dönmediyse anket kapalı ya da zaten beğenilmiş
+    if not like:
+        ensure_poll_open(cursor, poll_id, now)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu anketi zaten beğenmişsiniz"
         )
     
-    # Beğeni ekle
-    cursor.execute(
-        "INSERT INTO likes (user_id, poll_id, created_at) VALUES (?, ?, ?)",
-        (current_user["id"], poll_id, now)
-    )
-    
-    # Sayacı güncelle
-    cursor.execute(
-        "UPDATE polls SET likes_count = likes_count + 1 WHERE id = ?",
-        (poll_id,)
-    )
-    
     db.commit()
+    invalidate_profile(like[0])
     
     return MessageResponse(message="Anket beğenildi")
 
 @router.delete("/like/{poll_id}", response_model=MessageResponse)
-async def unlike_poll(
+def unlike_poll(
     poll_id: int,
     current_user: dict = Depends(get_current_user),
     db = Depends(get_db)
@@ -289,9 +423,16 @@ async def unlike_poll(
     """
     cursor = db.cursor()
     
-    # Beğeni var mı?
+    # Beğeniyi sil (sayacı trigger düşürür); anket sahibinin kullanıcı adı
+    # profil cache'i için aynı ifadeden döner, satır yoksa beğeni yok
     cursor.execute(
-        "SELECT id FROM likes WHERE user_id = ? AND poll_id = ?",
+        """
+        DELETE FROM likes WHERE user_id = ? AND poll_id = ?
+        RETURNING id, (
+            SELECT u.username FROM polls p JOIN users u ON u.id = p.user_id
+            WHERE p.id = likes.poll_id
+        )
+        """,
         (current_user["id"], poll_id)
     )
     like = cursor.fetchone()
@@ -302,59 +443,40 @@ async def unlike_poll(
             detail="Bu anketi beğenmemişsiniz"
         )
     
-    # Beğeniyi sil
-    cursor.execute(
-        "DELETE FROM likes WHERE id = ?",
-        (like[0],)
-    )
-    
-    # Sayacı güncelle
-    cursor.execute(
-        "UPDATE polls SET likes_count = likes_count - 1 WHERE id = ?",
-        (poll_id,)
-    )
-    
     db.commit()
+    invalidate_profile(like[1])
     
     return MessageResponse(message="Beğeni kaldırıldı")
 
 @router.put("/me/profile", response_model=MessageResponse)
-async def update_profile(
+def update_profile(
     display_name: Optional[str] = Query(None, max_length=100),
     avatar_url: Optional[str] = Query(None, max_length=500),
     current_user: dict = Depends(get_current_user),
+    now: str = Depends(current_timestamp),
     db = Depends(get_db)
 ):
     """
     Profil güncelle
     """
     cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    
-    updates = []
-    params = []
-    
-    if display_name is not None:
-        updates.append("display_name = ?")
-        params.append(display_name)
     
-    if avatar_url is not None:
-        updates.append("avatar_url = ?")
-        params.append(avatar_url)
+    shape = (display_name is not None, avatar_url is not None)
+    query = PROFILE_UPDATE_SQL.get(shape)
     
-    if not updates:
+    if query is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Güncellenecek alan belirtilmedi"
         )
     
-    updates.append("updated_at = ?")
-    params.append(now)
-    params.append(current_user["id"])
+    params = [value for value in (display_name, avatar_url) if value is not None]
+    params.extend([now, current_user["id"]])
     
-    query = f"UPDATE users SET {', '.join(updates)} WHERE id = ?"
     cursor.execute(query, params)
     
     db.commit()
+    invalidate_user(current_user["id"])
+    invalidate_profile(current_user["username"])
     
     return MessageResponse(message="Profil güncellendi")
\ No newline at end of file
@@ -3,23 +3,58 @@
 # =============================================
 
 from fastapi import APIRouter, HTTPException, Depends, status
-from datetime import datetime
-from typing import Optional
+from fastapi.responses import ORJSONResponse
+from typing import Final, Optional
 
 from models.schemas import VoteCreate, VoteResponse, MessageResponse
-from database.connection import get_db
+from database.connection import current_timestamp, get_db
 from routers.auth import get_current_user
+from routers.users import invalidate_profile
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# =============================================
+# SQL
+# =============================================
+
+# Sorgu metinleri sabit tutulur ki bağlantının statement cache'inden
+# hazırlanmış hali tekrar kullanılsın; anket sayaçlarını trigger'lar günceller
+SQL_POLL_FOR_VOTE: Final[str] = (
+    "SELECT p.id, p.expires_at, u.username "
+    "FROM polls p JOIN users u ON u.id = p.user_id WHERE p.id = ?"
+)
+
+# Anket, sahibi ve kullanıcının mevcut oyu tek sorguda (oy yoksa v.* NULL)
+SQL_POLL_WITH_VOTE: Final[str] = """
+    SELECT p.expires_at, u.username, v.id, v.vote_type, v.created_at
+    FROM polls p
+    JOIN users u ON u.id = p.user_id
+    LEFT JOIN votes v ON v.poll_id = p.id AND v.user_id = ?
+    WHERE p.id = ?
+"""
+
+# Ekle ya da değiştir tek ifadede; yeni mi değişiklik mi olduğu yukarıdaki
+# sorgudan okunan önceki oydan anlaşılır
+SQL_UPSERT_VOTE: Final[str] = """
+    INSERT INTO votes (user_id, poll_id, vote_type, created_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id, poll_id) DO UPDATE SET vote_type = excluded.vote_type
+    RETURNING id, created_at
+"""
+
+# Silme ve varlık kontrolü tek ifadede: satır dönmezse oy yoktur
+SQL_DELETE_VOTE: Final[str] = "DELETE FROM votes WHERE user_id = ? AND poll_id = ? RETURNING id"
+
+SQL_MY_VOTE: Final[str] = "SELECT vote_type, created_at FROM votes WHERE user_id = ? AND poll_id = ?"
 
 # =============================================
 # API ENDPOINTS
 # =============================================
 
 @router.post("", response_model=VoteResponse)
-async def vote(
+def vote(
     vote_data: VoteCreate,
     current_user: dict = Depends(get_current_user),
+    now: str = Depends(current_timestamp),
     db = Depends(get_db)
 ):
     """
@@ -31,13 +66,9 @@ async def vote(
     Kullanıcı oyunu değiştirebilir.
     """
     cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    # Anket var mı ve aktif mi kontrol et
-    cursor.execute(
-        "SELECT id, expires_at, gercek_votes, efsane_votes FROM polls WHERE id = ?",
-        (vote_data.poll_id,)
-    )
+    # Anket var mı, aktif mi ve daha önce oy verilmiş mi
+    cursor.execute(SQL_POLL_WITH_VOTE, (current_user["id"], vote_data.poll_id))
     poll = cursor.fetchone()
     
     if not poll:
@@ -47,100 +78,58 @@ async def vote(
         )
     
     # Süre dolmuş mu?
-    if poll[1] < now:
+    if poll[0] < now:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu anketin süresi dolmuş"
         )
     
-    # Daha önce oy vermiş mi?
-    cursor.execute(
-        "SELECT id, vote_type FROM votes WHERE user_id = ? AND poll_id = ?",
-        (current_user["id"], vote_data.poll_id)
-    )
-    existing_vote = cursor.fetchone()
-    
-    if existing_vote:
-        old_vote_type = existing_vote[1]
-        
-        # Aynı oyu tekrar veriyorsa
-        if old_vote_type == vote_data.vote_type:
-            return VoteResponse(
-                poll_id=vote_data.poll_id,
-                vote_type=vote_data.vote_type,
-                message="Zaten bu şekilde oy vermişsiniz"
-            )
-        
-        # Oyu değiştir
-        cursor.execute(
-            "UPDATE votes SET vote_type = ? WHERE id = ?",
-            (vote_data.vote_type, existing_vote[0])
-        )
-        
-        # Anket sayaçlarını güncelle
-        if vote_data.vote_type == "gercek":
-            cursor.execute(
-                "UPDATE polls SET gercek_votes = gercek_votes + 1, efsane_votes = efsane_votes - 1 WHERE id = ?",
-                (vote_data.poll_id,)
-            )
-        else:
-            cursor.execute(
-                "UPDATE polls SET efsane_votes = efsane_votes + 1, gercek_votes = gercek_votes - 1 WHERE id = ?",
-                (vote_data.poll_id,)
-            )
-        
-        db.commit()
-        
+    old_vote_type = poll[3]
+    
+    # Aynı oyu tekrar veriyorsa yazma yapılmaz
+    if old_vote_type == vote_data.vote_type:
         return VoteResponse(
+            id=poll[2],
+            user_id=current_user["id"],
             poll_id=vote_data.poll_id,
             vote_type=vote_data.vote_type,
-            message="Oyunuz değiştirildi"
+            created_at=poll[4],
+            message="Zaten bu şekilde oy vermişsiniz"
         )
     
-    # Yeni oy
-    created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    # Oyu kaydet ya da değiştir (anket sayaçlarını trigger günceller)
     cursor.execute(
-        "INSERT INTO votes (user_id, poll_id, vote_type, created_at) VALUES (?, ?, ?, ?)",
-        (current_user["id"], vote_data.poll_id, vote_data.vote_type, created_at)
+        SQL_UPSERT_VOTE,
+        (current_user["id"], vote_data.poll_id, vote_data.vote_type, now)
     )
-    
-    # Anket sayacını güncelle
-    if vote_data.vote_type == "gercek":
-        cursor.execute(
-            "UPDATE polls SET gercek_votes = gercek_votes + 1 WHERE id = ?",
-            (vote_data.poll_id,)
-        )
-    else:
-        cursor.execute(
-            "UPDATE polls SET efsane_votes = efsane_votes + 1 WHERE id = ?",
-            (vote_data.poll_id,)
-        )
+    vote_id, created_at = cursor.fetchone()
     
     db.commit()
+    invalidate_profile(poll[1])
     
     return VoteResponse(
+        id=vote_id,
+        user_id=current_user["id"],
         poll_id=vote_data.poll_id,
         vote_type=vote_data.vote_type,
-        message="Oyunuz kaydedildi"
+        created_at=created_at,
+        message="Oyunuz kaydedildi" if old_vote_type is None else "Oyunuz değiştirildi"
     )
 
 @router.delete("/{poll_id}", response_model=MessageResponse)
-async def remove_vote(
+def remove_vote(
     poll_id: int,
     current_user: dict = Depends(get_current_user),
+    now: str = Depends(current_timestamp),
     db = Depends(get_db)
 ):
     """
     Oyu geri çek
     """
     cursor = db.cursor()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
     # Anket var mı ve aktif mi?
-    cursor.execute(
-        "SELECT id, expires_at FROM polls WHERE id = ?",
-        (poll_id,)
-    )
+    cursor.execute(SQL_POLL_FOR_VOTE, (poll_id,))
     poll = cursor.fetchone()
     
     if not poll:
@@ -155,11 +144,8 @@ async def remove_vote(
             detail="Bu anketin süresi dolmuş"
         )
     
-    # Oy var mı?
-    cursor.execute(
-        "SELECT id, vote_type FROM votes WHERE user_id = ? AND poll_id = ?",
-        (current_user["id"], poll_id)
-    )
+    # Oyu sil (sayacı trigger düşürür); satır dönmezse oy yok
+    cursor.execute(SQL_DELETE_VOTE, (current_user["id"], poll_id))
     vote = cursor.fetchone()
     
     if not vote:
@@ -168,30 +154,13 @@ async def remove_vote(
             detail="Bu ankete oy vermemişsiniz"
         )
     
-    # Oyu sil
-    cursor.execute(
-        "DELETE FROM votes WHERE id = ?",
-        (vote[0],)
-    )
-    
-    # Sayacı güncelle
-    if vote[1] == "gercek":
-        cursor.execute(
-            "UPDATE polls SET gercek_votes = gercek_votes - 1 WHERE id = ?",
-            (poll_id,)
-        )
-    else:
-        cursor.execute(
-            "UPDATE polls SET efsane_votes = efsane_votes - 1 WHERE id = ?",
-            (poll_id,)
-        )
-    
     db.commit()
+    invalidate_profile(poll[2])
     
     return MessageResponse(message="Oyunuz geri çekildi")
 
 @router.get("/{poll_id}/my-vote")
-async def get_my_vote(
+def get_my_vote(
     poll_id: int,
     current_user: dict = Depends(get_current_user),
     db = Depends(get_db)
@@ -199,12 +168,11 @@ async def get_my_vote(
     """
     Kullanıcının bu anketteki oyunu getir
     """
+    # Tek satırlık UNIQUE(user_id, poll_id) araması; worker'lar arası tutarlılık
+    # için cache'lenmez
     cursor = db.cursor()
     
-    cursor.execute(
-        "SELECT vote_type, created_at FROM votes WHERE user_id = ? AND poll_id = ?",
-        (current_user["id"], poll_id)
-    )
+    cursor.execute(SQL_MY_VOTE, (current_user["id"], poll_id))
     vote = cursor.fetchone()
     
     if not vote:
@@ -213,4 +181,4 @@ async def get_my_vote(
     return {
         "vote_type": vote[0],
         "voted_at": vote[1]
-    }
\ No newline at end of file
+    }